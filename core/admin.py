@@ -1,19 +1,89 @@
 from django.contrib import admin
-from .models import Document, Analysis, Conversation
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR, PAGE_VAR
+from django.core.paginator import Paginator
+from django.db.models import Max, Min, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from .models import Document, Analysis, Conversation, ConversationArchive
+from .search import CONVERSATION_FTS_TABLE, conversation_fts_available, fts_match_query
+
+CURSOR_VAR = 'after'
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids exact COUNT(*) scans on large tables.
+
+    An unfiltered count is estimated from the primary key range, which is
+    read from the index. Filtered counts stop at COUNT_LIMIT rows.
+    """
+    COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            bounds = queryset.model._default_manager.aggregate(low=Min('pk'), high=Max('pk'))
+            if bounds['high'] is None:
+                return 0
+            return bounds['high'] - bounds['low'] + 1
+        return queryset.order_by()[:self.COUNT_LIMIT].count()
+
+class KeysetChangeList(ChangeList):
+    """Change list paging by primary key (?after=<id>) instead of OFFSET.
+
+    Keyset paging applies while the list uses the admin's default -pk
+    ordering; an explicit column sort falls back to page numbers.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.keyset = ORDER_VAR not in request.GET
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.keyset and self.cursor and self.cursor.isdigit():
+            queryset = queryset.filter(pk__lt=int(self.cursor))
+        return queryset
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.next_page_url = None
+        self.first_page_url = None
+        if not self.keyset:
+            return
+        if self.cursor:
+            self.first_page_url = self.get_query_string(remove=[CURSOR_VAR, PAGE_VAR])
+        rows = list(self.result_list)
+        if self.multi_page and rows:
+            self.next_page_url = self.get_query_string({CURSOR_VAR: rows[-1].pk}, [PAGE_VAR])
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ('title', 'uploaded_at')
     search_fields = ('title',)
     list_filter = ('uploaded_at',)
-    readonly_fields = ('uploaded_at',)
+    readonly_fields = ('uploaded_at', 'page_hashes')
+    raw_id_fields = ('parent',)
 
 @admin.register(Analysis)
 class AnalysisAdmin(admin.ModelAdmin):
     list_display = ('document', 'created_at')
+    list_select_related = ('document',)
     search_fields = ('document__title',)
-    list_filter = ('created_at',)
+    date_hierarchy = 'created_at'
     readonly_fields = ('created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # The analysis blobs are only needed on the change form
+        return super().get_queryset(request).defer('fee_perspective_analysis', 'persona_analyses')
 
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing an existing object
@@ -28,21 +98,47 @@ class ConversationAdmin(admin.ModelAdmin):
         'short_message',
         'timestamp'
     )
-    list_filter = ('is_fee', 'timestamp', ('document', admin.EmptyFieldListFilter))  # Fixed this line
+    list_filter = ('is_fee', ('document', admin.EmptyFieldListFilter))
+    date_hierarchy = 'timestamp'
     search_fields = ('message', 'document__title', 'conversation_id')
     readonly_fields = ('timestamp',)
     raw_id_fields = ('document', 'parent_message')
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def conversation_context(self, obj):
         return f"Document: {obj.document.title}" if obj.document else "General Chat"
     conversation_context.short_description = "Context"
 
     def short_message(self, obj):
-        return (obj.message[:50] + '...') if len(obj.message) > 50 else obj.message
+        return (obj.message_preview[:50] + '...') if len(obj.message_preview) > 50 else obj.message_preview
     short_message.short_description = "Message"
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('document')
+        # The document is joined for the context column and __str__ (used by
+        # the action checkbox); only the start of each message is loaded.
+        return super().get_queryset(request).select_related('document').defer(
+            'message', 'document__page_hashes'
+        ).annotate(message_preview=Substr('message', 1, 51))
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        match_query = fts_match_query(search_term)
+        # A blank or whitespace-only term would be an FTS5 syntax error
+        if not match_query or not conversation_fts_available():
+            return super().get_search_results(request, queryset, search_term)
+
+        matching_messages = RawSQL(
+            f"SELECT rowid FROM {CONVERSATION_FTS_TABLE} WHERE {CONVERSATION_FTS_TABLE} MATCH %s",
+            [match_query]
+        )
+        matching_documents = Document.objects.filter(title__icontains=search_term).values('pk')
+        return queryset.filter(
+            Q(pk__in=matching_messages) | Q(document__in=matching_documents)
+        ), False
 
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing an existing object
@@ -60,4 +156,20 @@ class ConversationAdmin(admin.ModelAdmin):
             'fields': ('timestamp',),
             'classes': ('collapse',)
         })
-    )
\ No newline at end of file
+    )
+
+@admin.register(ConversationArchive)
+class ConversationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('document', 'message_count', 'first_timestamp', 'last_timestamp', 'created_at')
+    list_select_related = ('document',)
+    search_fields = ('document__title',)
+    date_hierarchy = 'first_timestamp'
+    exclude = ('data',)
+    readonly_fields = ('document', 'message_count', 'first_timestamp', 'last_timestamp', 'created_at')
+
+    def get_queryset(self, request):
+        # The compressed segment is never shown
+        return super().get_queryset(request).defer('data')
+
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,26 @@
+import os
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _warm_up_enabled():
+    value = getattr(settings, 'FEE_WARM_UP', os.environ.get('FEE_WARM_UP', ''))
+    return str(value).lower() in ('1', 'true', 'yes')
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .db import configure_sqlite_connection, configure_sqlite_databases
+
+        configure_sqlite_databases()
+        connection_created.connect(configure_sqlite_connection)
+
+        # Opt-in: pre-forking servers load the analyzer once in the master
+        if _warm_up_enabled():
+            from .fee_analyzer import warm_up
+            warm_up()
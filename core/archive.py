@@ -0,0 +1,103 @@
+import json
+import zlib
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Conversation, ConversationArchive
+from .serializers import ConversationSerializer
+
+ARCHIVE_SEGMENT_SIZE = 1000
+
+def archive_cutoff(days=None):
+    """Messages older than this belong in the archive (CONVERSATION_ARCHIVE_AFTER_DAYS)"""
+    if days is None:
+        days = getattr(settings, 'CONVERSATION_ARCHIVE_AFTER_DAYS', 90)
+    return timezone.now() - timedelta(days=days)
+
+def archivable_conversations(cutoff):
+    """Document conversations older than the cutoff.
+
+    General chat stays in the hot table, since only document conversations are
+    read back from the archive, and so do messages with a reply that is not yet old.
+    """
+    return Conversation.objects.filter(
+        document__isnull=False,
+        timestamp__lt=cutoff
+    ).exclude(responses__timestamp__gte=cutoff)
+
+def archive_document_conversations(document_id, cutoff, segment_size=ARCHIVE_SEGMENT_SIZE):
+    """Move a document's old messages into compressed segments, returning (segments, messages)"""
+    segments = messages = 0
+    while True:
+        with transaction.atomic():
+            # Newest first, so replies are archived before the messages they
+            # answer and deleting a parent never clears a live parent_message
+            batch = list(
+                archivable_conversations(cutoff)
+                .filter(document_id=document_id)
+                .select_related('document')
+                .order_by('-timestamp', '-pk')[:segment_size]
+            )
+            if not batch:
+                return segments, messages
+            batch.reverse()
+
+            ConversationArchive.objects.create(
+                document_id=document_id,
+                first_timestamp=batch[0].timestamp,
+                last_timestamp=batch[-1].timestamp,
+                message_count=len(batch),
+                data=zlib.compress(json.dumps(ConversationSerializer(batch, many=True).data).encode('utf-8'), 9)
+            )
+            Conversation.objects.filter(pk__in=[message.pk for message in batch]).delete()
+
+        segments += 1
+        messages += len(batch)
+
+def merge_archived_conversations(document, messages):
+    """Merge serialized hot messages with the document's archived ones in timestamp order"""
+    archived = [message for segment in document.conversation_archives.all() for message in segment.messages()]
+    if not archived:
+        return messages
+    # Segments are not globally ordered: a message held back for a live reply
+    # is archived by a later run, after newer messages
+    return sorted(
+        archived + list(messages),
+        key=lambda message: (parse_datetime(message['timestamp']), message['id'])
+    )
+
+def thread_history(document, conversation_id, limit):
+    """The last ``limit`` messages of a document chat thread, oldest first.
+
+    Includes archived messages, so an old thread keeps its context. Archive
+    segments are read only when the conversation table holds fewer than
+    ``limit`` of the thread's messages, newest segment first.
+    """
+    history = list(
+        Conversation.objects.filter(
+            document=document,
+            conversation_id=conversation_id
+        ).order_by('-timestamp', '-pk').values('id', 'message', 'is_fee', 'timestamp')[:limit]
+    )
+    if len(history) < limit and document is not None:
+        segments = document.conversation_archives.order_by('-last_timestamp', '-pk')
+        if history:
+            segments = segments.filter(first_timestamp__lte=history[-1]['timestamp'])
+        for segment in segments.iterator(chunk_size=10):
+            if len(history) >= limit and segment.last_timestamp < history[limit - 1]['timestamp']:
+                break
+            history += [
+                {
+                    'id': message['id'],
+                    'message': message['message'],
+                    'is_fee': message['is_fee'],
+                    'timestamp': parse_datetime(message['timestamp'])
+                }
+                for message in segment.messages()
+                if message['conversation_id'] == conversation_id
+            ]
+            history.sort(key=lambda turn: (turn['timestamp'], turn['id']), reverse=True)
+    # Chronological, as the turns are replayed to the model in list order
+    return [{'message': turn['message'], 'is_fee': turn['is_fee']} for turn in reversed(history[:limit])]
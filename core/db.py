@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import connections
+
+# Production profile applied to every new SQLite connection. Override
+# individual pragmas with the SQLITE_PRAGMAS setting.
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block the writer
+    'busy_timeout': 5000,         # wait for the write lock instead of failing
+    'synchronous': 'NORMAL',      # safe with WAL, one fsync per checkpoint
+    'mmap_size': 268435456,       # 256 MiB of the file mapped for reads
+    'temp_store': 'MEMORY',
+}
+
+DEFAULT_SQLITE_CONN_MAX_AGE = 600
+
+def get_sqlite_pragmas():
+    """Return the pragmas applied to new SQLite connections"""
+    return {**DEFAULT_SQLITE_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created handler applying the SQLite pragma profile"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+def configure_sqlite_databases():
+    """Enable persistent connections and immediate write transactions for SQLite aliases.
+
+    BEGIN IMMEDIATE takes the write lock up front, so a transaction waits on
+    busy_timeout instead of failing with "database is locked" when it
+    upgrades from a read to a write.
+    """
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        if settings_dict['ENGINE'] != 'django.db.backends.sqlite3':
+            continue
+        if not settings_dict.get('CONN_MAX_AGE'):
+            settings_dict['CONN_MAX_AGE'] = getattr(settings, 'SQLITE_CONN_MAX_AGE', DEFAULT_SQLITE_CONN_MAX_AGE)
+            settings_dict['CONN_HEALTH_CHECKS'] = True
+        settings_dict.setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
@@ -0,0 +1,113 @@
+import os
+import re
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of a file starting at ``start``.
+
+    Exposes ``fileno`` so WSGI servers with a sendfile-capable
+    ``wsgi.file_wrapper`` (e.g. gunicorn) can send the range zero-copy,
+    bounded by the response's Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        self.file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Parse a single-range Range header into an inclusive (start, end) pair.
+
+    Returns None when the header is absent or uses a form we do not serve
+    (multiple ranges), in which case the whole file is sent. Raises
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def serve_file(request, field_file, content_type='application/pdf', filename=None):
+    """Serve a stored file with Range support, offloading to the web server when configured.
+
+    ``filename`` is offered to the client in Content-Disposition; it defaults
+    to the stored name, which for content-addressed blobs is just a digest.
+
+    ``SENDFILE_BACKEND`` selects the strategy: ``'nginx'`` answers with an
+    X-Accel-Redirect to ``SENDFILE_URL``, ``'xsendfile'`` with an X-Sendfile
+    path (Apache/lighttpd). Both let the front server handle Range itself.
+    Without a backend the file is streamed by Django through
+    ``wsgi.file_wrapper``.
+    """
+    backend = getattr(settings, 'SENDFILE_BACKEND', None)
+    filename = filename or os.path.basename(field_file.name)
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'SENDFILE_URL', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + field_file.name
+    elif backend == 'xsendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = field_file.path
+    else:
+        size = field_file.size
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        file = field_file.storage.open(field_file.name, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(RangeFile(file, start, length), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+
+    response['Accept-Ranges'] = 'bytes'
+    # Encodes non-ASCII titles per RFC 6266 instead of breaking the header
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    return response
@@ -0,0 +1,150 @@
+import csv
+import datetime
+import itertools
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+from .models import Analysis, Conversation, ConversationArchive
+
+EXPORT_CHUNK_SIZE = 2000
+
+# kind -> (model, exported columns, timestamp column used for date filters)
+EXPORTS = {
+    'analyses': (
+        Analysis,
+        ['id', 'document_id', 'fee_perspective_analysis', 'persona_analyses', 'created_at'],
+        'created_at',
+    ),
+    'conversations': (
+        Conversation,
+        ['id', 'document_id', 'conversation_id', 'parent_message_id', 'message', 'is_fee', 'timestamp'],
+        'timestamp',
+    ),
+}
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+def parse_bound(value, end=False):
+    """Parse an ISO date or datetime filter bound; a bare end date covers the whole day"""
+    if not value:
+        return None
+    try:
+        # Checked first: parse_datetime also accepts a bare date, as midnight
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        parsed = day = None
+    if day:
+        if end:
+            day += datetime.timedelta(days=1)
+        parsed = datetime.datetime.combine(day, datetime.time.min)
+    elif parsed is None:
+        raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def export_rows(kind, start=None, end=None, document=None):
+    """Iterate the rows of an export in primary key order without loading the table.
+
+    Conversation exports also include messages moved out by
+    archive_conversations; those come first, one archive segment at a time.
+    """
+    if kind not in EXPORTS:
+        raise ValueError(f"Unknown export: {kind}")
+    model, fields, timestamp_field = EXPORTS[kind]
+    lower = parse_bound(start)
+    upper = parse_bound(end, end=True)
+    # A bare end date is moved to the next midnight, so it is exclusive
+    end_inclusive = bool(end) and parse_date(end) is None
+
+    queryset = model.objects.order_by('pk')
+    if lower:
+        queryset = queryset.filter(**{f'{timestamp_field}__gte': lower})
+    if upper:
+        queryset = queryset.filter(**{f'{timestamp_field}__{"lte" if end_inclusive else "lt"}': upper})
+    if document:
+        queryset = queryset.filter(document_id=document)
+
+    rows = queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if kind == 'conversations':
+        return itertools.chain(archived_conversation_rows(lower, upper, end_inclusive, document), rows)
+    return rows
+
+def archived_conversation_rows(lower=None, upper=None, end_inclusive=False, document=None):
+    """Rows for archived conversation messages in the conversations export layout"""
+    segments = ConversationArchive.objects.order_by('first_timestamp', 'pk')
+    if lower:
+        segments = segments.filter(last_timestamp__gte=lower)
+    if upper:
+        segments = segments.filter(first_timestamp__lte=upper)
+    if document:
+        segments = segments.filter(document_id=document)
+
+    # Segments hold up to ARCHIVE_SEGMENT_SIZE messages each, so fetch a few at a time
+    for segment in segments.iterator(chunk_size=10):
+        for message in sorted(segment.messages(), key=lambda message: message['id']):
+            # Archived timestamps are serialized text; match the table's UTC datetimes
+            timestamp = parse_datetime(message['timestamp']).astimezone(datetime.timezone.utc)
+            if lower and timestamp < lower:
+                continue
+            if upper and (timestamp > upper if end_inclusive else timestamp >= upper):
+                continue
+            yield {
+                'id': message['id'],
+                'document_id': message['document'],
+                'conversation_id': message['conversation_id'],
+                'parent_message_id': message['parent_message'],
+                'message': message['message'],
+                'is_fee': message['is_fee'],
+                'timestamp': timestamp,
+            }
+
+def iter_ndjson(rows):
+    """Encode rows as newline-delimited JSON"""
+    for row in rows:
+        yield (json.dumps(row, cls=DjangoJSONEncoder) + '\n').encode('utf-8')
+
+class _LineBuffer:
+    """File-like object that hands csv.writer's output straight back"""
+
+    def write(self, value):
+        return value
+
+def iter_csv(rows, fields):
+    """Encode rows as CSV, with JSON columns serialized as JSON text"""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(fields).encode('utf-8')
+    for row in rows:
+        values = []
+        for field in fields:
+            value = row[field]
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, cls=DjangoJSONEncoder)
+            elif isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            values.append(value)
+        yield writer.writerow(values).encode('utf-8')
+
+def gzip_stream(chunks, level=6):
+    """Gzip-compress a byte stream on the fly"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def stream_export(kind, output='ndjson', compress=True, **filters):
+    """Return an iterator of encoded (and optionally gzipped) export bytes"""
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {output}")
+    rows = export_rows(kind, **filters)
+    fields = EXPORTS[kind][1]
+    chunks = iter_ndjson(rows) if output == 'ndjson' else iter_csv(rows, fields)
+    return gzip_stream(chunks) if compress else chunks
@@ -0,0 +1,31 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# The analyzer module pulls in openai (with httpx and pydantic) and PyPDF2,
+# so it is only imported once an analyze or chat request needs it. Keep
+# this package's __init__ free of heavy imports.
+
+def get_analyzer():
+    """Return a FeeAnalyzer, importing its dependencies on first use"""
+    from .analyzer import FeeAnalyzer
+    return FeeAnalyzer()
+
+def warm_up():
+    """Import the analyzer and build the OpenAI client ahead of the first request.
+
+    Meant for pre-forking servers: call it in the master process (e.g. from
+    gunicorn's ``when_ready`` hook with ``preload_app``) or set FEE_WARM_UP
+    so CoreConfig.ready() calls it, and every worker inherits the loaded
+    modules. No network connections are opened.
+    """
+    started = time.perf_counter()
+    get_analyzer()
+    import openai
+    try:
+        # First attribute access builds the module-level client (httpx, SSL context)
+        openai.chat.completions
+    except openai.OpenAIError as e:
+        logger.warning(f"Skipping OpenAI client warm-up: {str(e)}")
+    logger.info(f"Fee analyzer warmed up in {(time.perf_counter() - started) * 1000:.0f}ms")
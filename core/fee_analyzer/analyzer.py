@@ -1,15 +1,45 @@
-from typing import Dict, Any, List
-from venv import logger
+from typing import Dict, Any, List, Tuple
+import logging
+import os
 import openai
 from django.conf import settings
 import PyPDF2
 import io
 import re
 import json
-from .prompts import FEE_SYSTEM_PROMPT, ANALYSIS_PROMPT, FEE_CHAT_PROMPT, CHAT_CONTEXT_PROMPT
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from .prompts import (
+    FEE_SYSTEM_PROMPT,
+    ANALYSIS_PROMPT,
+    FEE_CHAT_PROMPT,
+    CHAT_CONTEXT_PROMPT,
+    PERSONA_REVIEW_SYSTEM_PROMPT,
+    DOCUMENT_PROMPT,
+    PERSONA_ANALYSIS_PROMPT,
+    STRUCTURED_ANALYSIS_PROMPT,
+    STRUCTURED_REPAIR_PROMPT,
+)
+from .personas import DEFAULT_PERSONA, get_persona
+from .schemas import StructuredAnalysis, STRUCTURED_ANALYSIS_RESPONSE_FORMAT
+from pydantic import ValidationError
+from . import stub
+
+logger = logging.getLogger(__name__)
 
 class FeeAnalyzer:
     """Fee's analysis engine for evaluating documents from a high-SES perspective."""
+
+    # 'text' parses the free-text layout; 'structured' asks for schema-constrained JSON
+    ANALYSIS_MODES = ('text', 'structured')
+
+    # Stored with cached section analyses: changing a prompt or the schema
+    # either mode uses changes the version and so invalidates old results
+    SECTION_PROMPT_VERSION = hashlib.sha256(json.dumps([
+        FEE_SYSTEM_PROMPT, ANALYSIS_PROMPT,
+        PERSONA_REVIEW_SYSTEM_PROMPT, DOCUMENT_PROMPT, get_persona(DEFAULT_PERSONA)['system_prompt'],
+        STRUCTURED_ANALYSIS_PROMPT, STRUCTURED_REPAIR_PROMPT, STRUCTURED_ANALYSIS_RESPONSE_FORMAT
+    ]).encode('utf-8')).hexdigest()[:12]
     
     def __init__(self):
         self.api_key = settings.OPENAI_API_KEY
@@ -17,46 +47,240 @@ class FeeAnalyzer:
 
     def extract_text_from_pdf(self, pdf_file) -> str:
         """Extract text content from PDF file"""
+        return "\n".join(self.extract_pages_from_pdf(pdf_file)).strip()
+
+    def extract_pages_from_pdf(self, pdf_file) -> List[str]:
+        """Extract the text of each page of a PDF file"""
         pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_file.read()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        return [page.extract_text() for page in pdf_reader.pages]
+
+    @staticmethod
+    def hash_page(text: str) -> str:
+        """Hash a page's text, ignoring whitespace-only differences"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
 
-    def analyze_document(self, pdf_file) -> Dict[str, Any]:
+    def analyze_document(self, pdf_file, mode: str = 'text') -> Dict[str, Any]:
         """Main analysis method"""
         try:
             text = self.extract_text_from_pdf(pdf_file)
             if not text.strip():
                 raise ValueError("No text could be extracted from the PDF")
             
+            if mode == 'structured':
+                return self.get_structured_analysis_from_openai(text)
             return self.get_analysis_from_openai(text)
-        except PyPDF2.PdfReadError:
+        except PyPDF2.errors.PdfReadError:
             raise ValueError("Invalid or corrupted PDF file")
         except Exception as e:
             raise ValueError(f"Error analyzing document: {str(e)}")
 
+    def analyze_document_personas(self, pdf_file, persona_keys: List[str], mode: str = 'text') -> Dict[str, Dict[str, Any]]:
+        """Analyze a document for several personas sharing one text extraction"""
+        try:
+            text = self.extract_text_from_pdf(pdf_file)
+            if not text.strip():
+                raise ValueError("No text could be extracted from the PDF")
+        except PyPDF2.errors.PdfReadError:
+            raise ValueError("Invalid or corrupted PDF file")
+
+        if mode == 'structured':
+            analyze = self.get_structured_analysis_from_openai
+        else:
+            analyze = self.get_persona_analysis_from_openai
+
+        # Persona runs are I/O bound, so total latency tracks the slowest one
+        with ThreadPoolExecutor(max_workers=len(persona_keys)) as executor:
+            futures = {
+                key: executor.submit(analyze, text, key)
+                for key in persona_keys
+            }
+            try:
+                return {key: future.result() for key, future in futures.items()}
+            except Exception as e:
+                raise ValueError(f"Error analyzing document: {str(e)}")
+
+    def analyze_sections(self, sections: Dict[str, str], mode: str = 'text') -> Dict[str, Dict[str, Any]]:
+        """Analyze page sections concurrently, keyed by page hash"""
+        if not sections:
+            return {}
+        if mode == 'structured':
+            analyze = self.get_structured_analysis_from_openai
+        else:
+            analyze = self.get_analysis_from_openai
+        with ThreadPoolExecutor(max_workers=min(len(sections), 8)) as executor:
+            futures = {
+                text_hash: executor.submit(analyze, text)
+                for text_hash, text in sections.items()
+            }
+            try:
+                return {text_hash: future.result() for text_hash, future in futures.items()}
+            except Exception as e:
+                raise ValueError(f"Error analyzing document sections: {str(e)}")
+
+    def merge_section_analyses(self, sections: List[Tuple[int, str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Merge per-page analyses (page number, page text, analysis) into one analysis"""
+        if not sections:
+            raise ValueError("No sections to merge")
+
+        def unique(items):
+            return list(dict.fromkeys(item for item in items if item))
+
+        weights = [max(len(text), 1) for _, text, _ in sections]
+        analyses = [analysis for _, _, analysis in sections]
+        score = sum(
+            weight * analysis["overall_assessment"]["inclusivity_score"]
+            for weight, analysis in zip(weights, analyses)
+        ) / sum(weights)
+
+        expectations = {}
+        for key, expectation in analyses[0]["fee_perspective"]["expectations"].items():
+            considerations = unique(
+                analysis["fee_perspective"]["expectations"][key]["consideration"]
+                for analysis in analyses
+                if "not provided" not in analysis["fee_perspective"]["expectations"][key]["consideration"]
+            )
+            expectations[key] = {
+                "perspective": expectation["perspective"],
+                "consideration": "; ".join(considerations) or expectation["consideration"]
+            }
+
+        facets = {}
+        for key in analyses[0]["facet_analysis"]:
+            facets[key] = {
+                field: unique(item for analysis in analyses for item in analysis["facet_analysis"][key][field])
+                for field in ("assumptions", "potential_issues", "recommendations")
+            }
+
+        return {
+            "overall_assessment": {
+                "inclusivity_score": round(score, 3),
+                "score_justification": " ".join(unique(
+                    analysis["overall_assessment"]["score_justification"] for analysis in analyses
+                )) or None,
+                "major_concerns": unique(
+                    item for analysis in analyses for item in analysis["overall_assessment"]["major_concerns"]
+                ),
+                "positive_aspects": unique(
+                    item for analysis in analyses for item in analysis["overall_assessment"]["positive_aspects"]
+                )
+            },
+            "fee_perspective": {
+                "expectations": expectations,
+                "recommendations": unique(
+                    item for analysis in analyses for item in analysis["fee_perspective"]["recommendations"]
+                )
+            },
+            "facet_analysis": facets,
+            "raw_analysis": "\n\n".join(
+                f"--- Page {page} ---\n{analysis['raw_analysis']}" for page, _, analysis in sections
+            )
+        }
+
     def get_analysis_from_openai(self, text: str) -> Dict[str, Any]:
         """Get analysis from OpenAI"""
-        # Truncate text if too long (OpenAI has token limits)
-        max_length = 14000  # Approximate limit for GPT-4
-        if len(text) > max_length:
-            text = text[:max_length] + "..."
+        text = self._truncate_text(text)
 
         messages = [
             {"role": "system", "content": FEE_SYSTEM_PROMPT},
             {"role": "user", "content": ANALYSIS_PROMPT.format(text=text)}
         ]
 
-        response = openai.chat.completions.create(
+        response = self._create_completion(
             model=settings.OPENAI_MODEL,
             messages=messages,
             temperature=0.7,
             max_tokens=2000,
         )
 
-        analysis_text = response.choices[0].message.content
-        
+        return self._parse_analysis(response.choices[0].message.content, DEFAULT_PERSONA)
+
+    def get_persona_analysis_from_openai(self, text: str, persona_key: str) -> Dict[str, Any]:
+        """Get one persona's analysis from OpenAI"""
+        persona = get_persona(persona_key)
+        text = self._truncate_text(text)
+
+        # The document comes first and is identical for every persona so the
+        # shared prefix is eligible for provider-side prompt caching.
+        messages = [
+            {"role": "system", "content": PERSONA_REVIEW_SYSTEM_PROMPT},
+            {"role": "user", "content": DOCUMENT_PROMPT.format(text=text)},
+            {"role": "system", "content": persona['system_prompt']},
+            {"role": "user", "content": PERSONA_ANALYSIS_PROMPT.format(name=persona['name'])}
+        ]
+
+        response = self._create_completion(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000,
+        )
+
+        return self._parse_analysis(response.choices[0].message.content, persona_key)
+
+    def get_structured_analysis_from_openai(self, text: str, persona_key: str = DEFAULT_PERSONA) -> Dict[str, Any]:
+        """Get a schema-constrained JSON analysis from OpenAI"""
+        persona = get_persona(persona_key)
+        text = self._truncate_text(text)
+
+        messages = [
+            {"role": "system", "content": PERSONA_REVIEW_SYSTEM_PROMPT},
+            {"role": "user", "content": DOCUMENT_PROMPT.format(text=text)},
+            {"role": "system", "content": persona['system_prompt']},
+            {"role": "user", "content": STRUCTURED_ANALYSIS_PROMPT.format(name=persona['name'])}
+        ]
+
+        content = self._create_structured_completion(messages)
+        try:
+            analysis = StructuredAnalysis.model_validate_json(content)
+        except ValidationError as e:
+            # One targeted repair: show the model its output and the errors
+            logger.warning(f"Structured analysis failed validation, retrying: {e.error_count()} errors")
+            messages += [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": STRUCTURED_REPAIR_PROMPT.format(errors=str(e))}
+            ]
+            content = self._create_structured_completion(messages)
+            try:
+                analysis = StructuredAnalysis.model_validate_json(content)
+            except ValidationError as e:
+                raise ValueError(f"Structured analysis did not match the schema: {str(e)}")
+
+        return analysis.to_analysis(persona['perspectives'], content)
+
+    def _create_structured_completion(self, messages: List[Dict]) -> str:
+        """Request a completion constrained to the structured analysis schema"""
+        response = self._create_completion(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000,
+            response_format=STRUCTURED_ANALYSIS_RESPONSE_FORMAT,
+        )
+
+        content = response.choices[0].message.content
+        if not content:
+            raise ValueError("Empty response received from OpenAI")
+        return content
+
+    def _create_completion(self, **kwargs):
+        """Create a chat completion with OpenAI, or the offline stub when configured"""
+        backend = getattr(settings, 'FEE_ANALYZER_BACKEND', os.environ.get('FEE_ANALYZER_BACKEND', 'openai'))
+        if backend == 'stub':
+            return stub.create_completion(**kwargs)
+        return openai.chat.completions.create(**kwargs)
+
+    def _truncate_text(self, text: str) -> str:
+        """Truncate text if too long (OpenAI has token limits)"""
+        max_length = 14000  # Approximate limit for GPT-4
+        if len(text) > max_length:
+            text = text[:max_length] + "..."
+        return text
+
+    def _parse_analysis(self, analysis_text: str, persona_key: str) -> Dict[str, Any]:
+        """Parse the free-text analysis into the stored analysis schema"""
+        perspectives = get_persona(persona_key)['perspectives']
+
         # Extract score and justification
         score_match = re.search(r'SCORE:\s*(\d*\.?\d+)', analysis_text)
         score = float(score_match.group(1)) if score_match else 0.5
@@ -81,19 +305,19 @@ class FeeAnalyzer:
             "fee_perspective": {
                 "expectations": {
                     "technology_access": {
-                        "perspective": "Expects latest devices and reliable high-speed internet",
+                        "perspective": perspectives['technology_access'],
                         "consideration": access_considerations or "Detailed access analysis not provided"
                     },
                     "technical_literacy": {
-                        "perspective": "Comfortable with complex technical documentation",
+                        "perspective": perspectives['technical_literacy'],
                         "consideration": literacy_requirements or "Detailed literacy analysis not provided"
                     },
                     "risk_comfort": {
-                        "perspective": "Highly comfortable exploring new features",
+                        "perspective": perspectives['risk_comfort'],
                         "consideration": self._extract_risk_considerations(analysis_text)
                     },
                     "control": {
-                        "perspective": "Expects full control over technology",
+                        "perspective": perspectives['control'],
                         "consideration": self._extract_control_considerations(analysis_text)
                     }
                 },
@@ -127,7 +351,7 @@ class FeeAnalyzer:
             messages.append({"role": "user", "content": user_message})
 
             # Make the API call
-            response = openai.chat.completions.create(
+            response = self._create_completion(
                 model=settings.OPENAI_MODEL,
                 messages=messages,
                 temperature=0.7,
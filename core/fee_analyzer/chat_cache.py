@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from django.conf import settings
+from .prompts import FEE_CHAT_PROMPT, CHAT_CONTEXT_PROMPT
+
+logger = logging.getLogger(__name__)
+
+# Changing either chat prompt changes the version and so invalidates old replies
+CHAT_PROMPT_VERSION = hashlib.sha256((FEE_CHAT_PROMPT + CHAT_CONTEXT_PROMPT).encode('utf-8')).hexdigest()[:12]
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS metrics (
+    endpoint TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+'''
+
+def normalize_message(message: str) -> str:
+    """Normalize case, whitespace and trailing punctuation of a chat message"""
+    return " ".join(message.lower().split()).rstrip('?!. ')
+
+def history_fingerprint(history: Optional[List[Dict]]) -> str:
+    """Hash the conversation history sent along with a message"""
+    turns = [[bool(turn['is_fee']), turn['message']] for turn in history or []]
+    return hashlib.sha256(json.dumps(turns).encode('utf-8')).hexdigest()
+
+class ChatResponseCache:
+    """LRU cache with a TTL for Fee's chat replies.
+
+    Entries live in a local SQLite file, so every worker process on the
+    host shares one cache and one set of hit/miss counters.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: int = 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def make_key(self, analysis_id: Optional[int], message: str, history: Optional[List[Dict]]) -> str:
+        parts = [analysis_id, normalize_message(message), history_fingerprint(history),
+                 CHAT_PROMPT_VERSION, settings.OPENAI_MODEL]
+        return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str, endpoint: str) -> Optional[str]:
+        """Return a cached reply, recording a hit or miss for the endpoint"""
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute(
+            'SELECT response FROM entries WHERE key = ? AND created_at > ?',
+            (key, now - self.ttl)
+        ).fetchone()
+        if row:
+            connection.execute('UPDATE entries SET last_used = ? WHERE key = ?', (now, key))
+        self._record(endpoint, hit=bool(row))
+        return row[0] if row else None
+
+    def set(self, key: str, response: str):
+        """Store a reply, evicting expired and least recently used entries"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, response, created_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, response, now, now)
+            )
+            connection.execute('DELETE FROM entries WHERE created_at <= ?', (now - self.ttl,))
+            connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _record(self, endpoint: str, hit: bool):
+        column = 'hits' if hit else 'misses'
+        self._connection().execute(
+            f'INSERT INTO metrics (endpoint, {column}) VALUES (?, 1) '
+            f'ON CONFLICT (endpoint) DO UPDATE SET {column} = {column} + 1',
+            (endpoint,)
+        )
+
+    def stats(self) -> Dict:
+        connection = self._connection()
+        endpoints = {}
+        for endpoint, hits, misses in connection.execute('SELECT endpoint, hits, misses FROM metrics'):
+            lookups = hits + misses
+            endpoints[endpoint] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else None
+            }
+        return {
+            'entries': connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0],
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'prompt_version': CHAT_PROMPT_VERSION,
+            'endpoints': endpoints
+        }
+
+    def clear(self):
+        self._connection().executescript('DELETE FROM entries; DELETE FROM metrics;')
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_chat_cache() -> ChatResponseCache:
+    """Return the process-wide cache configured by the FEE_CHAT_CACHE_* settings"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            default_path = os.path.join(str(getattr(settings, 'BASE_DIR', '.')), 'fee_chat_cache.sqlite3')
+            _cache = ChatResponseCache(
+                path=getattr(settings, 'FEE_CHAT_CACHE_PATH', default_path),
+                max_entries=getattr(settings, 'FEE_CHAT_CACHE_MAX_ENTRIES', 10000),
+                ttl=getattr(settings, 'FEE_CHAT_CACHE_TTL', 86400)
+            )
+        return _cache
+
+def chat_cache_enabled(endpoint: str) -> bool:
+    """Whether replies for an endpoint may be cached (see FEE_CHAT_CACHE_DISABLED_ENDPOINTS)"""
+    return (
+        getattr(settings, 'FEE_CHAT_CACHE_ENABLED', True)
+        and endpoint not in getattr(settings, 'FEE_CHAT_CACHE_DISABLED_ENDPOINTS', ())
+    )
+
+def cached_chat_response(endpoint: str, analysis_id: Optional[int], message: str,
+                         history: Optional[List[Dict]], compute: Callable[[], str],
+                         bypass: bool = False) -> str:
+    """Return a cached reply for this question, calling ``compute`` on a miss.
+
+    ``bypass`` skips the lookup (e.g. for Cache-Control: no-cache) but
+    still stores the fresh reply.
+    """
+    if not chat_cache_enabled(endpoint):
+        return compute()
+
+    cache = get_chat_cache()
+    key = cache.make_key(analysis_id, message, history)
+    if not bypass:
+        try:
+            response = cache.get(key, endpoint)
+        except sqlite3.Error as e:
+            logger.warning(f"Chat cache lookup failed: {str(e)}")
+            response = None
+        if response is not None:
+            return response
+
+    response = compute()
+    try:
+        cache.set(key, response)
+    except sqlite3.Error as e:
+        logger.warning(f"Chat cache store failed: {str(e)}")
+    return response
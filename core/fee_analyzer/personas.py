@@ -0,0 +1,62 @@
+from typing import Dict, Any, List
+from .prompts import FEE_SYSTEM_PROMPT, DAV_SYSTEM_PROMPT, ABI_SYSTEM_PROMPT
+
+DEFAULT_PERSONA = 'fee'
+
+# Registry of personas available for document analysis. The perspective
+# strings fill the "expectations" block of the stored analysis schema.
+PERSONAS: Dict[str, Dict[str, Any]] = {
+    'fee': {
+        'name': 'Fee',
+        'system_prompt': FEE_SYSTEM_PROMPT,
+        'perspectives': {
+            'technology_access': "Expects latest devices and reliable high-speed internet",
+            'technical_literacy': "Comfortable with complex technical documentation",
+            'risk_comfort': "Highly comfortable exploring new features",
+            'control': "Expects full control over technology",
+        },
+    },
+    'dav': {
+        'name': 'Dav',
+        'system_prompt': DAV_SYSTEM_PROMPT,
+        'perspectives': {
+            'technology_access': "Uses older shared devices with limited or metered internet",
+            'technical_literacy': "Struggles with jargon and dense technical documentation",
+            'risk_comfort': "Avoids unfamiliar features that could cost time, money or data",
+            'control': "Feels technology often controls them rather than the reverse",
+        },
+    },
+    'abi': {
+        'name': 'Abi',
+        'system_prompt': ABI_SYSTEM_PROMPT,
+        'perspectives': {
+            'technology_access': "Uses whatever technology the task requires",
+            'technical_literacy': "Reads documentation comprehensively before acting",
+            'risk_comfort': "Risk-averse about features that might waste time or break things",
+            'control': "Low computer self-efficacy; blames self when things go wrong",
+        },
+    },
+}
+
+
+def get_persona(key: str) -> Dict[str, Any]:
+    """Look up a persona by key"""
+    try:
+        return PERSONAS[key]
+    except KeyError:
+        raise ValueError(f"Unknown persona: {key}")
+
+
+def parse_persona_keys(value) -> List[str]:
+    """Normalize a list or comma separated string of persona keys"""
+    if isinstance(value, str):
+        value = value.split(',')
+    keys = []
+    for key in value or []:
+        key = str(key).strip().lower()
+        if not key:
+            continue
+        get_persona(key)
+        if key not in keys:
+            keys.append(key)
+    return keys
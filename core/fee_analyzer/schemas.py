@@ -0,0 +1,73 @@
+from typing import Dict, Any, List
+from pydantic import BaseModel, ConfigDict, field_validator
+
+class StrictModel(BaseModel):
+    # extra='forbid' emits additionalProperties: false, as strict mode requires
+    model_config = ConfigDict(extra='forbid')
+
+class OverallAssessment(StrictModel):
+    inclusivity_score: float
+    score_justification: str
+    major_concerns: List[str]
+    positive_aspects: List[str]
+
+    @field_validator('inclusivity_score')
+    @classmethod
+    def score_in_range(cls, value: float) -> float:
+        if not 0.0 <= value <= 1.0:
+            raise ValueError("inclusivity_score must be between 0.0 and 1.0")
+        return value
+
+class Expectations(StrictModel):
+    technology_access: str
+    technical_literacy: str
+    risk_comfort: str
+    control: str
+
+class Facet(StrictModel):
+    assumptions: List[str]
+    potential_issues: List[str]
+    recommendations: List[str]
+
+class FacetAnalysis(StrictModel):
+    technology_access: Facet
+    communication: Facet
+    risk_assessment: Facet
+    privacy_security: Facet
+    control_authority: Facet
+    education_culture: Facet
+
+class StructuredAnalysis(StrictModel):
+    """Model output for the structured analysis mode"""
+    overall_assessment: OverallAssessment
+    expectations: Expectations
+    recommendations: List[str]
+    facet_analysis: FacetAnalysis
+
+    def to_analysis(self, perspectives: Dict[str, str], raw_analysis: str) -> Dict[str, Any]:
+        """Convert to the stored fee_perspective_analysis schema"""
+        considerations = self.expectations.model_dump()
+        return {
+            "overall_assessment": self.overall_assessment.model_dump(),
+            "fee_perspective": {
+                "expectations": {
+                    key: {
+                        "perspective": perspective,
+                        "consideration": considerations[key]
+                    }
+                    for key, perspective in perspectives.items()
+                },
+                "recommendations": self.recommendations
+            },
+            "facet_analysis": self.facet_analysis.model_dump(),
+            "raw_analysis": raw_analysis
+        }
+
+STRUCTURED_ANALYSIS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "document_analysis",
+        "strict": True,
+        "schema": StructuredAnalysis.model_json_schema(),
+    },
+}
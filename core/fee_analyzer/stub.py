@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+from django.conf import settings
+from .prompts import FEE_CHAT_PROMPT
+
+# Canned completions used when FEE_ANALYZER_BACKEND is 'stub', so load tests
+# and local development run without OpenAI credentials or network access.
+
+STUB_ANALYSIS = '''1. Overall Assessment:
+   SCORE: 0.62
+   JUSTIFICATION: The document assumes reliable connectivity and comfort with technical terms.
+
+   MAJOR CONCERNS:
+   - Setup steps require a modern browser and a stable connection
+   - Error messages rely on technical jargon
+
+   POSITIVE ASPECTS:
+   - Steps are numbered and short
+
+2. Technology Access Analysis:
+   ACCESS CONSIDERATIONS: Expects an up-to-date device with broadband internet
+   LITERACY REQUIREMENTS: Assumes familiarity with software installation terminology
+
+3. Detailed Analysis:
+   a) Technology Access & Reliability
+      - Assumes always-on internet access
+
+   c) Risk & Exploration Requirements
+      - Users must try features without an undo option
+
+   d) Control & Authority Assumptions
+      - Users are expected to change system settings
+
+Recommendations:
+- Offer an offline mode
+- Add a glossary of technical terms'''
+
+STUB_CHAT_REPLY = (
+    "From where I sit, the biggest barrier is the assumption of reliable broadband. "
+    "I'd never notice it, but users on metered connections would."
+)
+
+def _facet():
+    return {
+        "assumptions": ["Assumes a reliable internet connection"],
+        "potential_issues": ["Unreliable access interrupts the workflow"],
+        "recommendations": ["Support offline use"]
+    }
+
+STUB_STRUCTURED_ANALYSIS = {
+    "overall_assessment": {
+        "inclusivity_score": 0.62,
+        "score_justification": "The document assumes reliable connectivity and comfort with technical terms.",
+        "major_concerns": ["Setup steps require a stable connection"],
+        "positive_aspects": ["Steps are numbered and short"]
+    },
+    "expectations": {
+        "technology_access": "Expects broadband internet",
+        "technical_literacy": "Assumes installation terminology is familiar",
+        "risk_comfort": "Users must try features without an undo option",
+        "control": "Users are expected to change system settings"
+    },
+    "recommendations": ["Offer an offline mode", "Add a glossary of technical terms"],
+    "facet_analysis": {
+        key: _facet() for key in (
+            "technology_access", "communication", "risk_assessment",
+            "privacy_security", "control_authority", "education_culture"
+        )
+    }
+}
+
+def create_completion(**kwargs):
+    """Offline stand-in for openai.chat.completions.create"""
+    latency = float(getattr(settings, 'FEE_STUB_LATENCY', os.environ.get('FEE_STUB_LATENCY', 0.5)))
+    # Jitter so latency percentiles look like a real model call
+    time.sleep(latency * random.uniform(0.5, 1.5))
+
+    if kwargs.get('response_format'):
+        content = json.dumps(STUB_STRUCTURED_ANALYSIS)
+    elif kwargs['messages'][0]['content'] == FEE_CHAT_PROMPT:
+        content = STUB_CHAT_REPLY
+    else:
+        content = STUB_ANALYSIS
+
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
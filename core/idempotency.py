@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+POLL_INTERVAL = 0.25
+
+def request_fingerprint(request) -> str:
+    """Hash a request's method, path and data; uploaded files count by name and size"""
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    payload = json.dumps(
+        [request.method, request.path, data],
+        sort_keys=True,
+        default=lambda value: [getattr(value, 'name', None), getattr(value, 'size', None)]
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def claim_key(key: str, path: str, fingerprint: str):
+    """Record a new key, returning (record, created).
+
+    Expired keys and in-progress keys older than IDEMPOTENCY_LOCK_TIMEOUT
+    (left behind by a crashed worker) are cleared first.
+    """
+    now = timezone.now()
+    ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)
+    lock_timeout = getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 600)
+
+    with transaction.atomic():
+        IdempotencyKey.objects.filter(created_at__lt=now - timedelta(seconds=ttl)).delete()
+        IdempotencyKey.objects.filter(
+            key=key, path=path, completed=False,
+            created_at__lt=now - timedelta(seconds=lock_timeout)
+        ).delete()
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(key=key, path=path, fingerprint=fingerprint), True
+        except IntegrityError:
+            return IdempotencyKey.objects.get(key=key, path=path), False
+
+def replay(record: IdempotencyKey) -> Response:
+    return Response(record.response_body, status=record.response_status, headers={REPLAYED_HEADER: 'true'})
+
+def idempotent(view_method):
+    """Make a POST action safe to retry with an Idempotency-Key header.
+
+    The first request with a key runs the view and stores its response for
+    IDEMPOTENCY_KEY_TTL seconds; repeats get the stored response back. A
+    repeat that arrives while the first is still running waits for it (up
+    to IDEMPOTENCY_WAIT_TIMEOUT seconds). 5xx responses are not stored, so
+    a retry after a failure runs the view again.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+
+        if not 0 < len(key) <= 255:
+            return Response(
+                {"error": "Idempotency-Key must be between 1 and 255 characters"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        deadline = time.monotonic() + getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 120)
+
+        while True:
+            record, created = claim_key(key, request.path, fingerprint)
+            if created:
+                break
+
+            if record.fingerprint != fingerprint:
+                return Response(
+                    {"error": "Idempotency-Key was already used for a different request"},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+
+            while not record.completed and time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                record = IdempotencyKey.objects.filter(pk=record.pk).first()
+                if record is None:
+                    break
+
+            if record is None:
+                # The original request failed and released the key; take it over
+                continue
+            if record.completed:
+                logger.info(f"Replaying response for idempotency key {key} on {request.path}")
+                return replay(record)
+            return Response(
+                {"error": "A request with this Idempotency-Key is still in progress"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.completed = True
+            record.response_status = response.status_code
+            record.response_body = getattr(response, 'data', None)
+            record.save(update_fields=['completed', 'response_status', 'response_body'])
+        return response
+
+    return wrapper
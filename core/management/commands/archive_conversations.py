@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from core.archive import (
+    ARCHIVE_SEGMENT_SIZE,
+    archive_cutoff,
+    archivable_conversations,
+    archive_document_conversations
+)
+
+class Command(BaseCommand):
+    help = (
+        "Move document conversations older than CONVERSATION_ARCHIVE_AFTER_DAYS out of the "
+        "conversation table into compressed per-document archive segments. Run it on a "
+        "schedule, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive messages older than this many days')
+        parser.add_argument('--segment-size', type=int, default=ARCHIVE_SEGMENT_SIZE,
+                            help='Maximum messages per archive segment')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        document_ids = list(
+            archivable_conversations(cutoff).order_by().values_list('document_id', flat=True).distinct()
+        )
+
+        if options['dry_run']:
+            count = archivable_conversations(cutoff).count()
+            self.stdout.write(
+                f"Would archive {count} messages from {len(document_ids)} documents older than {cutoff:%Y-%m-%d %H:%M}"
+            )
+            return
+
+        total_segments = total_messages = 0
+        for document_id in document_ids:
+            segments, messages = archive_document_conversations(document_id, cutoff, options['segment_size'])
+            total_segments += segments
+            total_messages += messages
+            self.stdout.write(f"Document {document_id}: archived {messages} messages in {segments} segments")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {total_messages} messages from {len(document_ids)} documents "
+            f"into {total_segments} segments"
+        ))
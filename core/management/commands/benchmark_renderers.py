@@ -0,0 +1,129 @@
+import json
+import time
+import uuid
+from io import BytesIO
+from datetime import timedelta
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from core.fee_analyzer.personas import PERSONAS
+from core.fee_analyzer.stub import STUB_ANALYSIS, STUB_CHAT_REPLY, STUB_STRUCTURED_ANALYSIS
+from core.models import Analysis, Conversation, Document
+from core.renderers import FastJSONParser, FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from core.serializers import AnalysisSerializer, ConversationSerializer
+
+JSON_FIELDS = ('fee_perspective_analysis', 'persona_analyses')
+
+def build_analysis(persona_key):
+    """An analysis in the stored layout, sized like a real multi-page review"""
+    structured = STUB_STRUCTURED_ANALYSIS
+    return {
+        "overall_assessment": structured["overall_assessment"],
+        "fee_perspective": {
+            "expectations": {
+                key: {"perspective": perspective, "consideration": structured["expectations"][key]}
+                for key, perspective in PERSONAS[persona_key]["perspectives"].items()
+            },
+            "recommendations": structured["recommendations"]
+        },
+        "facet_analysis": structured["facet_analysis"],
+        "raw_analysis": "\n\n".join([STUB_ANALYSIS] * 4)
+    }
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer with the fast JSON and MessagePack renderers on "
+        "in-memory analysis and conversation payloads, including JSONField pass-through, "
+        "and DRF's JSONParser with the fast parser."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyses', type=int, default=200, help='Analyses in the list payload')
+        parser.add_argument('--conversations', type=int, default=2000, help='Messages in the conversation payload')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the fastest is reported')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson is not installed, so there is nothing to compare")
+        self.repeat = options['repeat']
+
+        # JSONField columns hold this text; reading them normally means json.loads
+        stored = {
+            'fee_perspective_analysis': json.dumps(build_analysis('fee')),
+            'persona_analyses': json.dumps({key: build_analysis(key) for key in PERSONAS}),
+        }
+        now = timezone.now()
+
+        def analyses(raw):
+            rows = []
+            for pk in range(1, options['analyses'] + 1):
+                analysis = Analysis(id=pk, document_id=pk, created_at=now)
+                for field in JSON_FIELDS:
+                    if raw:
+                        setattr(analysis, f'{field}_json', stored[field])
+                    else:
+                        setattr(analysis, field, json.loads(stored[field]))
+                rows.append(analysis)
+            return rows
+
+        document = Document(id=1, title='Benchmark')
+        conversations = [
+            Conversation(
+                id=pk, document=document, is_fee=bool(pk % 2), timestamp=now + timedelta(seconds=pk),
+                message=STUB_CHAT_REPLY if pk % 2 else "What would you change first?",
+                conversation_id=str(uuid.uuid4())
+            )
+            for pk in range(1, options['conversations'] + 1)
+        ]
+
+        cases = {
+            'analyses': {
+                'drf_json': lambda: self.render(AnalysisSerializer, analyses(raw=False), JSONRenderer()),
+                'fast_json': lambda: self.render(AnalysisSerializer, analyses(raw=False), FastJSONRenderer()),
+                'fast_json_passthrough': lambda: self.render(AnalysisSerializer, analyses(raw=True), FastJSONRenderer()),
+            },
+            'conversations': {
+                'drf_json': lambda: self.render(ConversationSerializer, conversations, JSONRenderer()),
+                'fast_json': lambda: self.render(ConversationSerializer, conversations, FastJSONRenderer()),
+            },
+        }
+        if msgpack is not None:
+            cases['analyses']['msgpack'] = lambda: self.render(
+                AnalysisSerializer, analyses(raw=True), MessagePackRenderer())
+            cases['conversations']['msgpack'] = lambda: self.render(
+                ConversationSerializer, conversations, MessagePackRenderer())
+
+        results = {name: self.compare(group) for name, group in cases.items()}
+
+        body = JSONRenderer().render(AnalysisSerializer(analyses(raw=False), many=True).data)
+        results['parse_analyses'] = self.compare({
+            'drf_json': lambda: (self.parse(JSONParser(), body), len(body)),
+            'fast_json': lambda: (self.parse(FastJSONParser(), body), len(body)),
+        })
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def render(self, serializer_class, rows, renderer):
+        """Serialize and render rows the way a list view would, returning (content, size)"""
+        context = {'request': SimpleNamespace(accepted_renderer=renderer)}
+        content = renderer.render(serializer_class(rows, many=True, context=context).data)
+        return content, len(content)
+
+    def parse(self, parser, body):
+        return parser.parse(BytesIO(body), parser_context={'encoding': 'utf-8'})
+
+    def compare(self, group):
+        """Time each case, reporting the fastest run and the speedup over DRF"""
+        results = {}
+        for name, case in group.items():
+            timings = []
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                _, size = case()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {'ms': round(min(timings), 1), 'bytes': size}
+        baseline = results['drf_json']['ms']
+        for result in results.values():
+            result['speedup'] = round(baseline / result['ms'], 2) if result['ms'] else None
+        return results
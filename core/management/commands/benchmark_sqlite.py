@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+from core.db import configure_sqlite_connection, configure_sqlite_databases, get_sqlite_pragmas
+from core.models import Analysis, Document
+from core.views import DocumentViewSet
+
+QUESTIONS = [
+    "What's the biggest barrier here?",
+    "Which parts would confuse a first-time user?",
+    "What would you change first?",
+]
+
+class Command(BaseCommand):
+    help = (
+        "Stress-test concurrent chat turns through the real chat view against scratch "
+        "SQLite databases, comparing Django's default SQLite setup with the core.db "
+        "profile (pragmas, immediate transactions, persistent connections). Both use "
+        "the same lock timeout, and the stub analyzer backend answers every turn."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Concurrent writer threads')
+        parser.add_argument('--turns', type=int, default=200, help='Chat turns per writer')
+        parser.add_argument('--timeout', type=float,
+                            help='Lock wait in seconds before a turn fails, for both configurations '
+                                 '(default: the profile busy_timeout)')
+        parser.add_argument('--model-latency', type=float, default=0.0,
+                            help='Seconds the stub model takes per reply')
+
+    def handle(self, *args, **options):
+        if options['timeout'] is None:
+            options['timeout'] = int(get_sqlite_pragmas()['busy_timeout']) / 1000
+
+        directory = tempfile.mkdtemp()
+        original = connections.settings['default']
+        try:
+            template = os.path.join(directory, 'template.sqlite3')
+            self.use_database(original, template, options, profile=False)
+            call_command('migrate', verbosity=0, interactive=False)
+            connections.close_all()
+
+            results = {
+                'timeout': options['timeout'],
+                'baseline': self.run(original, directory, template, options, profile=False),
+                'profile': self.run(original, directory, template, options, profile=True),
+            }
+        finally:
+            connections.close_all()
+            connections.settings['default'] = original
+            connection_created.connect(configure_sqlite_connection)
+            shutil.rmtree(directory, ignore_errors=True)
+
+        baseline, profile = results['baseline']['turns_per_sec'], results['profile']['turns_per_sec']
+        results['speedup'] = round(profile / baseline, 2) if baseline else None
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def use_database(self, original, path, options, profile):
+        """Point the default alias at a scratch file, with or without the core.db profile"""
+        connections.close_all()
+        connections.settings['default'] = {
+            **original,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'OPTIONS': {'timeout': options['timeout']},
+        }
+        # New connections read the alias settings, so drop any cached wrapper
+        try:
+            del connections['default']
+        except AttributeError:
+            pass
+        if profile:
+            configure_sqlite_databases()
+            connection_created.connect(configure_sqlite_connection)
+        else:
+            connection_created.disconnect(configure_sqlite_connection)
+
+    def run(self, original, directory, template, options, profile):
+        """Run one configuration on a fresh copy of the migrated database"""
+        path = os.path.join(directory, 'profile.sqlite3' if profile else 'baseline.sqlite3')
+        shutil.copyfile(template, path)
+        self.use_database(original, path, options, profile)
+
+        documents = []
+        for worker in range(options['writers']):
+            document = Document.objects.create(title=f'Stress test {worker}')
+            Analysis.objects.create(document=document, fee_perspective_analysis={})
+            documents.append(document.pk)
+        connections.close_all()
+
+        view = DocumentViewSet.as_view({'post': 'chat'})
+        factory = APIRequestFactory()
+        counters = {'turns': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def writer(document_id):
+            conversation_id = None
+            for turn in range(options['turns']):
+                data = {'message': f'{QUESTIONS[turn % len(QUESTIONS)]} ({turn})'}
+                if conversation_id:
+                    data['conversation_id'] = conversation_id
+                request = factory.post(f'/api/documents/{document_id}/chat/', data, format='json')
+                response = view(request, pk=document_id)
+                # What request_finished does: close the connection unless it is persistent
+                close_old_connections()
+                with lock:
+                    if response.status_code == 200:
+                        counters['turns'] += 1
+                    else:
+                        counters['failed'] += 1
+                if response.status_code == 200:
+                    conversation_id = response.data['conversation'][0]['conversation_id']
+            connections.close_all()
+
+        overrides = {
+            'FEE_ANALYZER_BACKEND': 'stub',
+            'FEE_STUB_LATENCY': options['model_latency'],
+            'FEE_CHAT_CACHE_ENABLED': False,
+            'SQLITE_PRAGMAS': {'busy_timeout': int(options['timeout'] * 1000)},
+        }
+        with override_settings(**overrides):
+            threads = [threading.Thread(target=writer, args=(pk,)) for pk in documents]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        connections.close_all()
+
+        return {
+            'writers': options['writers'],
+            'completed_turns': counters['turns'],
+            'failed_turns': counters['failed'],
+            'seconds': round(elapsed, 3),
+            'turns_per_sec': round(counters['turns'] / elapsed, 1),
+        }
@@ -0,0 +1,105 @@
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ('openai', 'httpx', 'pydantic', 'PyPDF2')
+
+LOADED_MODULES_SCRIPT = '''
+import json, sys, django
+django.setup()
+import core.urls
+print(json.dumps([name for name in {modules!r} if name in sys.modules]))
+'''
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def summarize(samples):
+    return {
+        'runs': len(samples),
+        'min_ms': round(min(samples), 1),
+        'median_ms': round(statistics.median(samples), 1),
+        'max_ms': round(max(samples), 1),
+    }
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: wall time of `manage.py check` in a fresh interpreter, and "
+        "of a runserver worker from launch to its first HTTP response. Also lists which "
+        "heavy dependencies are imported just by loading the URLconf."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Repetitions per measurement')
+        parser.add_argument('--path', default='/api/documents/', help='URL requested from the booted worker')
+        parser.add_argument('--warm-up', action='store_true',
+                            help='Boot workers with FEE_WARM_UP=1 to include the analyzer warm-up')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Seconds to wait for a worker')
+
+    def handle(self, *args, **options):
+        self.manage = os.path.join(str(settings.BASE_DIR), 'manage.py')
+        self.env = dict(os.environ)
+        if options['warm_up']:
+            self.env['FEE_WARM_UP'] = '1'
+
+        results = {
+            'loaded_on_startup': self.loaded_modules(),
+            'check': summarize([self.time_check() for _ in range(options['runs'])]),
+            'first_response': summarize([
+                self.time_first_response(options['path'], options['timeout'])
+                for _ in range(options['runs'])
+            ]),
+            'warm_up': options['warm_up'],
+        }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def loaded_modules(self):
+        output = subprocess.run(
+            [sys.executable, '-c', LOADED_MODULES_SCRIPT.format(modules=HEAVY_MODULES)],
+            env=self.env, cwd=str(settings.BASE_DIR), capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def time_check(self):
+        """Wall time in ms of `manage.py check` in a fresh interpreter"""
+        started = time.perf_counter()
+        subprocess.run([sys.executable, self.manage, 'check'], env=self.env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return (time.perf_counter() - started) * 1000
+
+    def time_first_response(self, path, timeout):
+        """Wall time in ms from launching a worker to its first HTTP response"""
+        port = free_port()
+        url = f'http://127.0.0.1:{port}{path}'
+        started = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, self.manage, 'runserver', '--noreload', f'127.0.0.1:{port}'],
+            env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None:
+                    raise CommandError(f"Server exited with status {server.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=timeout) as response:
+                        response.read()
+                    return (time.perf_counter() - started) * 1000
+                except urllib.error.HTTPError:
+                    # Any HTTP status means the worker is serving
+                    return (time.perf_counter() - started) * 1000
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.01)
+            raise CommandError(f"No response from {url} within {timeout:g}s")
+        finally:
+            server.terminate()
+            server.wait()
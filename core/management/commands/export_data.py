@@ -0,0 +1,37 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from core.exporters import EXPORTS, EXPORT_FORMATS, stream_export
+
+class Command(BaseCommand):
+    help = "Stream analyses or conversations to NDJSON or CSV in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='output', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--start', help='Only rows on or after this ISO date/datetime')
+        parser.add_argument('--end', help='Only rows on or before this ISO date/datetime')
+        parser.add_argument('--document', type=int, help='Only rows for this document id')
+        parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+        parser.add_argument('-o', '--output-file', help='Write to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            stream = stream_export(
+                options['kind'],
+                output=options['output'],
+                compress=options['gzip'],
+                start=options['start'],
+                end=options['end'],
+                document=options['document']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output_file']:
+            with open(options['output_file'], 'wb') as destination:
+                for chunk in stream:
+                    destination.write(chunk)
+        else:
+            for chunk in stream:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,214 @@
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+
+ENDPOINTS = ('upload', 'analyze', 'chat', 'list', 'detail')
+
+DEFAULT_MIX = 'upload=1,analyze=1,chat=4,list=6,detail=4'
+
+QUESTIONS = [
+    "What's the biggest barrier here?",
+    "Which parts would confuse a first-time user?",
+    "How would someone on a slow connection cope?",
+    "What would you change first?",
+    "Is the language too technical?",
+]
+
+def build_pdf(pages):
+    """Build a minimal valid PDF with one line of text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return output.encode('latin-1')
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+class Command(BaseCommand):
+    help = (
+        "Drive a live local server with a weighted mix of upload, analyze, chat, list "
+        "and detail traffic, ramping concurrency and reporting per-endpoint latency "
+        "percentiles as JSON. Start the server with FEE_ANALYZER_BACKEND=stub so no "
+        "OpenAI calls are made."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/api')
+        parser.add_argument('--stages', default='1,4,8,16',
+                            help='Comma separated concurrency levels to ramp through')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds per stage')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='Endpoint weights, e.g. chat=4,list=6')
+        parser.add_argument('--seed-documents', type=int, default=3,
+                            help='Documents uploaded and analyzed before the first stage')
+        parser.add_argument('--pages', type=int, default=5, help='Pages per generated PDF')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds')
+        parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        self.pages = options['pages']
+        self.lock = threading.Lock()
+        self.analyzed = []
+        self.pending = []
+
+        mix = self.parse_mix(options['mix'])
+        stages = [int(level) for level in options['stages'].split(',') if level.strip()]
+
+        for _ in range(options['seed_documents']):
+            ok, _ = self.send_upload()
+            if not ok:
+                raise CommandError(f"Could not seed documents at {self.base_url}; is the server running?")
+            self.send_analyze()
+        if not self.analyzed:
+            raise CommandError("No seed document could be analyzed")
+
+        report = {
+            'base_url': self.base_url,
+            'mix': mix,
+            'stages': [self.run_stage(concurrency, options['duration'], mix) for concurrency in stages]
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as destination:
+                destination.write(output)
+        self.stdout.write(output)
+
+    def parse_mix(self, value):
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in ENDPOINTS:
+                raise CommandError(f"Unknown endpoint in mix: {name}")
+            mix[name] = float(weight or 1)
+        return mix
+
+    def run_stage(self, concurrency, duration, mix):
+        """Run one concurrency level for ``duration`` seconds and summarize it"""
+        samples = {endpoint: [] for endpoint in mix}
+        errors = {endpoint: 0 for endpoint in mix}
+        names, weights = list(mix), list(mix.values())
+        deadline = time.monotonic() + duration
+
+        def worker():
+            while time.monotonic() < deadline:
+                endpoint = random.choices(names, weights)[0]
+                started = time.perf_counter()
+                ok, _ = getattr(self, f'send_{endpoint}')()
+                elapsed = (time.perf_counter() - started) * 1000
+                with self.lock:
+                    samples[endpoint].append(elapsed)
+                    if not ok:
+                        errors[endpoint] += 1
+
+        self.stderr.write(f"Stage: {concurrency} concurrent users for {duration:g}s")
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        endpoints = {}
+        for endpoint, values in samples.items():
+            values.sort()
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'errors': errors[endpoint],
+                'error_rate': round(errors[endpoint] / len(values), 4) if values else None,
+                'throughput_rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 0.50), 1) if values else None,
+                'p95_ms': round(percentile(values, 0.95), 1) if values else None,
+                'p99_ms': round(percentile(values, 0.99), 1) if values else None,
+            }
+
+        total = sum(len(values) for values in samples.values())
+        return {
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 2),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'error_rate': round(sum(errors.values()) / total, 4) if total else None,
+            'endpoints': endpoints,
+        }
+
+    def request(self, method, path, body=None, content_type='application/json'):
+        """Send a request, returning (ok, decoded JSON body or None)"""
+        headers = {'Accept': 'application/json'}
+        if body is not None:
+            headers['Content-Type'] = content_type
+            if content_type == 'application/json':
+                body = json.dumps(body).encode('utf-8')
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return True, json.loads(response.read() or b'null')
+        except (urllib.error.URLError, TimeoutError, ConnectionError, ValueError):
+            return False, None
+
+    def send_upload(self):
+        marker = uuid.uuid4().hex
+        pdf = build_pdf([f"Load test document {marker} page {page}" for page in range(self.pages)])
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="title"\r\n\r\nLoad test {marker}\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{marker}.pdf"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'
+        ).encode('utf-8') + pdf + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        ok, data = self.request('POST', '/documents/', body, f'multipart/form-data; boundary={boundary}')
+        if ok:
+            with self.lock:
+                self.pending.append(data['id'])
+        return ok, data
+
+    def send_analyze(self):
+        with self.lock:
+            document_id = self.pending.pop() if self.pending else random.choice(self.analyzed)
+        ok, data = self.request('POST', f'/documents/{document_id}/analyze/', {})
+        if ok:
+            with self.lock:
+                if document_id not in self.analyzed:
+                    self.analyzed.append(document_id)
+        return ok, data
+
+    def send_chat(self):
+        document_id = random.choice(self.analyzed)
+        return self.request('POST', f'/documents/{document_id}/chat/', {'message': random.choice(QUESTIONS)})
+
+    def send_list(self):
+        return self.request('GET', '/documents/')
+
+    def send_detail(self):
+        return self.request('GET', f'/documents/{random.choice(self.analyzed)}/')
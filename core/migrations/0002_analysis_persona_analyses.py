@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysis",
+            name="persona_analyses",
+            field=models.JSONField(
+                blank=True, default=dict, help_text="Analysis results keyed by persona"
+            ),
+        ),
+    ]
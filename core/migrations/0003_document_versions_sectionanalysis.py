@@ -0,0 +1,52 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_analysis_persona_analyses"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SectionAnalysis",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("text_hash", models.CharField(max_length=64, unique=True)),
+                ("analysis", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="page_hashes",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="SHA-256 of each page's normalized text",
+            ),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Previous version of this document",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="versions",
+                to="core.document",
+            ),
+        ),
+    ]
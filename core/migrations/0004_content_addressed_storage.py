@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:19
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_document_versions_sectionanalysis"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="document",
+            name="file",
+            field=models.FileField(
+                db_index=True,
+                storage=core.storage.ContentAddressedStorage(),
+                upload_to="documents/",
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:23
+
+from django.db import migrations, models
+
+# External-content FTS5 index over conversation text, kept in sync by
+# triggers. Note: SQLite drops these triggers if core_conversation is ever
+# rebuilt by a later AlterField, so such a migration must recreate them.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE core_conversation_fts USING fts5(
+        message, conversation_id, content='core_conversation', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER core_conversation_fts_ai AFTER INSERT ON core_conversation BEGIN
+        INSERT INTO core_conversation_fts(rowid, message, conversation_id)
+        VALUES (new.id, new.message, new.conversation_id);
+    END
+    """,
+    """
+    CREATE TRIGGER core_conversation_fts_ad AFTER DELETE ON core_conversation BEGIN
+        INSERT INTO core_conversation_fts(core_conversation_fts, rowid, message, conversation_id)
+        VALUES ('delete', old.id, old.message, old.conversation_id);
+    END
+    """,
+    """
+    CREATE TRIGGER core_conversation_fts_au AFTER UPDATE ON core_conversation BEGIN
+        INSERT INTO core_conversation_fts(core_conversation_fts, rowid, message, conversation_id)
+        VALUES ('delete', old.id, old.message, old.conversation_id);
+        INSERT INTO core_conversation_fts(rowid, message, conversation_id)
+        VALUES (new.id, new.message, new.conversation_id);
+    END
+    """,
+    "INSERT INTO core_conversation_fts(core_conversation_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    "DROP TRIGGER IF EXISTS core_conversation_fts_ai",
+    "DROP TRIGGER IF EXISTS core_conversation_fts_ad",
+    "DROP TRIGGER IF EXISTS core_conversation_fts_au",
+    "DROP TABLE IF EXISTS core_conversation_fts",
+]
+
+
+def fts5_supported(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("ENABLE_FTS5" in row[0] for row in cursor.fetchall())
+
+
+def create_conversation_fts(apps, schema_editor):
+    if fts5_supported(schema_editor):
+        for statement in CREATE_FTS:
+            schema_editor.execute(statement)
+
+
+def drop_conversation_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in DROP_FTS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_content_addressed_storage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="analysis",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["timestamp"], name="core_conver_timesta_119f3b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="conversation",
+            index=models.Index(
+                fields=["document", "timestamp"], name="core_conver_documen_8b9254_idx"
+            ),
+        ),
+        migrations.RunPython(create_conversation_fts, drop_conversation_fts),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConversationArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("first_timestamp", models.DateTimeField()),
+                ("last_timestamp", models.DateTimeField()),
+                ("message_count", models.PositiveIntegerField()),
+                (
+                    "data",
+                    models.BinaryField(
+                        help_text="zlib-compressed JSON list of serialized messages"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="conversation_archives",
+                        to="core.document",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["first_timestamp"],
+                "indexes": [
+                    models.Index(
+                        fields=["document", "first_timestamp"],
+                        name="core_conver_documen_345c0b_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_conversationarchive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sectionanalysis",
+            name="mode",
+            field=models.CharField(
+                default="",
+                help_text="Analysis mode that produced this result",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="sectionanalysis",
+            name="prompt_version",
+            field=models.CharField(
+                default="",
+                help_text="FeeAnalyzer.SECTION_PROMPT_VERSION when this was analyzed",
+                max_length=12,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sectionanalysis",
+            name="text_hash",
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="sectionanalysis",
+            constraint=models.UniqueConstraint(
+                fields=("text_hash", "mode", "prompt_version"),
+                name="unique_section_analysis_key",
+            ),
+        ),
+    ]
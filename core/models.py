@@ -1,9 +1,26 @@
-from django.db import models
+import json
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from .storage import content_addressed_storage
 
 class Document(models.Model):
     title = models.CharField(max_length=255)
-    file = models.FileField(upload_to='documents/')
+    file = models.FileField(upload_to='documents/', storage=content_addressed_storage, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    parent = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='versions',
+        help_text="Previous version of this document"
+    )
+    page_hashes = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="SHA-256 of each page's normalized text"
+    )
 
     class Meta:
         ordering = ['-uploaded_at']
@@ -11,14 +28,49 @@ class Document(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if not self.file or self.file._committed:
+            return super().save(*args, **kwargs)
+        # A new upload: hold its blob's lock until the row is committed, so
+        # collect_orphaned_blob cannot delete a blob this row is about to use
+        storage = self.file.storage
+        name = storage.blob_name(self.file.field.generate_filename(self, self.file.name), self.file)
+        with storage.lock(name), transaction.atomic():
+            return super().save(*args, **kwargs)
+
 class Analysis(models.Model):
     document = models.ForeignKey(Document, related_name='analyses', on_delete=models.CASCADE)
     fee_perspective_analysis = models.JSONField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    persona_analyses = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Analysis results keyed by persona"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"Analysis of {self.document.title}"
 
+class SectionAnalysis(models.Model):
+    """Cached analysis of a single page, shared by every document version containing it"""
+    text_hash = models.CharField(max_length=64)
+    mode = models.CharField(max_length=20, default='', help_text="Analysis mode that produced this result")
+    prompt_version = models.CharField(
+        max_length=12, default='', help_text="FeeAnalyzer.SECTION_PROMPT_VERSION when this was analyzed"
+    )
+    analysis = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['text_hash', 'mode', 'prompt_version'], name='unique_section_analysis_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Section analysis {self.text_hash[:12]} ({self.mode})"
+
 class Conversation(models.Model):
     document = models.ForeignKey(
         Document, 
@@ -49,7 +101,55 @@ class Conversation(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+            models.Index(fields=['document', 'timestamp']),
+        ]
 
     def __str__(self):
         context = f"for {self.document.title}" if self.document else "without document"
-        return f"{'Fee' if self.is_fee else 'User'} message {context}"
\ No newline at end of file
+        return f"{'Fee' if self.is_fee else 'User'} message {context}"
+
+
+class IdempotencyKey(models.Model):
+    """A client-supplied Idempotency-Key and the response it produced"""
+    key = models.CharField(max_length=255)
+    path = models.CharField(max_length=255, help_text="Request path the key was used on")
+    fingerprint = models.CharField(max_length=64, help_text="SHA-256 of the request method, path and data")
+    completed = models.BooleanField(default=False)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'path'], name='unique_idempotency_key_path'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} for {self.path}"
+
+class ConversationArchive(models.Model):
+    """A compressed segment of a document's old conversation messages.
+
+    Written by the archive_conversations command; the messages are stored
+    exactly as ConversationSerializer rendered them.
+    """
+    document = models.ForeignKey(Document, related_name='conversation_archives', on_delete=models.CASCADE)
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    message_count = models.PositiveIntegerField()
+    data = models.BinaryField(help_text="zlib-compressed JSON list of serialized messages")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['first_timestamp']
+        indexes = [
+            models.Index(fields=['document', 'first_timestamp']),
+        ]
+
+    def messages(self):
+        return json.loads(zlib.decompress(self.data))
+
+    def __str__(self):
+        return f"{self.message_count} archived messages for {self.document.title}"
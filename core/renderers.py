@@ -0,0 +1,114 @@
+import json
+import re
+import secrets
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, FormParser, MultiPartParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer, BrowsableAPIRenderer
+
+# Both encoders are optional: without orjson the JSON renderer and parser fall
+# back to DRF's stdlib implementation, and without msgpack the MessagePack
+# format is simply not offered.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class RawJSON:
+    """Already-encoded JSON text, e.g. a JSONField column read without decoding"""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+class RawJSONEncoder(JSONRenderer.encoder_class):
+    """DRF's JSON encoder, decoding RawJSON values it is handed"""
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            return json.loads(obj.text)
+        return super().default(obj)
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer backed by orjson, splicing RawJSON values into the output as-is.
+
+    Compact output matches JSONRenderer's except for float exponents: orjson
+    writes 1e16 and 2.5e-7 where the stdlib writes 1e+16 and 2.5e-07 (the
+    same values once parsed), and spliced RawJSON keeps the spacing it was
+    stored with. Indented output, e.g. for
+    ``Accept: application/json; indent=4`` or the browsable API, is left to
+    JSONRenderer, since orjson can only indent by two spaces.
+    """
+    encoder_class = RawJSONEncoder
+
+    # Read by RawJSONField: renderers without it get decoded values instead
+    splices_raw_json = orjson is not None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        encoder = self.encoder_class()
+        fragments = []
+        # A per-render token marks where each fragment goes; orjson escapes \x00
+        token = secrets.token_hex(8)
+
+        def default(obj):
+            if isinstance(obj, RawJSON):
+                fragments.append(obj.text)
+                return f'\x00{token}:{len(fragments) - 1}\x00'
+            # Dates, decimals, lazy strings etc. render exactly as with JSONRenderer
+            return encoder.default(obj)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        ret = orjson.dumps(data, default=default, option=option)
+
+        if fragments:
+            placeholder = re.compile(rb'"\\u0000' + token.encode() + rb':(\d+)\\u0000"')
+            ret = placeholder.sub(lambda match: fragments[int(match.group(1))].encode('utf-8'), ret)
+
+        # Match JSONRenderer, which escapes these for embedding in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders responses as MessagePack for clients that send Accept: application/msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default, use_bin_type=True)
+
+class FastJSONParser(JSONParser):
+    """JSONParser backed by orjson"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+API_RENDERER_CLASSES = [FastJSONRenderer]
+if msgpack is not None:
+    API_RENDERER_CLASSES.append(MessagePackRenderer)
+API_RENDERER_CLASSES.append(BrowsableAPIRenderer)
+
+API_PARSER_CLASSES = [FastJSONParser, FormParser, MultiPartParser]
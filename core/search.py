@@ -0,0 +1,20 @@
+from django.db import connection
+
+CONVERSATION_FTS_TABLE = 'core_conversation_fts'
+
+_fts_available = None
+
+def conversation_fts_available() -> bool:
+    """Whether the conversation full-text index exists on the default database"""
+    global _fts_available
+    if _fts_available is None:
+        _fts_available = (
+            connection.vendor == 'sqlite'
+            and CONVERSATION_FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available
+
+def fts_match_query(search_term: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix"""
+    terms = search_term.split()
+    return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
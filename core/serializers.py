@@ -1,15 +1,63 @@
+import json
+from django.db import models
+from django.db.models.functions import Cast
+from django.urls import reverse
 from rest_framework import serializers
 from .models import Document, Analysis, Conversation
+from .renderers import RawJSON
+
+def with_raw_json(queryset, *fields):
+    """Read JSONFields as their stored text (``<field>_json``) instead of decoding them"""
+    return queryset.defer(*fields).annotate(
+        **{f'{field}_json': Cast(field, models.TextField()) for field in fields}
+    )
+
+class RawJSONField(serializers.JSONField):
+    """JSONField that hands the stored text to renderers able to splice it.
+
+    Uses the ``<field>_json`` annotation from with_raw_json() when present,
+    and decodes it only if the accepted renderer cannot splice RawJSON.
+    """
+
+    def get_attribute(self, instance):
+        name = f'{self.source}_json'
+        if not hasattr(instance, name):
+            return super().get_attribute(instance)
+        raw = getattr(instance, name)
+        return None if raw is None else RawJSON(raw)
+
+    def to_representation(self, value):
+        if isinstance(value, RawJSON):
+            renderer = getattr(self.context.get('request'), 'accepted_renderer', None)
+            if getattr(renderer, 'splices_raw_json', False):
+                return value
+            value = json.loads(value.text)
+        return super().to_representation(value)
+
+class DownloadUrlMixin:
+    def get_download_url(self, obj):
+        if not obj.file:
+            return None
+        url = reverse('document-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+class DocumentSerializer(DownloadUrlMixin, serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
 
-class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
-        fields = ['id', 'title', 'file', 'uploaded_at']
+        fields = ['id', 'title', 'file', 'download_url', 'uploaded_at', 'parent']
 
 class AnalysisSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.JSONField: RawJSONField
+    }
+
     class Meta:
         model = Analysis
-        fields = ['id', 'document', 'fee_perspective_analysis', 'created_at']
+        fields = ['id', 'document', 'fee_perspective_analysis', 'persona_analyses', 'created_at']
 
 class ConversationSerializer(serializers.ModelSerializer):
     context_type = serializers.SerializerMethodField()
@@ -30,9 +78,10 @@ class ConversationSerializer(serializers.ModelSerializer):
     def get_context_type(self, obj):
         return 'document' if obj.document else 'general'
 
-class DocumentDetailSerializer(serializers.ModelSerializer):
+class DocumentDetailSerializer(DownloadUrlMixin, serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
     analyses = AnalysisSerializer(many=True, read_only=True)
-    conversations = ConversationSerializer(many=True, read_only=True)
+    conversations = serializers.SerializerMethodField()
     
     class Meta:
         model = Document
@@ -40,11 +89,19 @@ class DocumentDetailSerializer(serializers.ModelSerializer):
             'id', 
             'title', 
             'file', 
+            'download_url',
             'uploaded_at', 
+            'parent',
             'analyses', 
             'conversations'
         ]
 
+    def get_conversations(self, obj):
+        # Include messages moved out by archive_conversations
+        from .archive import merge_archived_conversations
+        messages = ConversationSerializer(obj.conversations.all(), many=True, context=self.context).data
+        return merge_archived_conversations(obj, messages)
+
 class ConversationThreadSerializer(serializers.ModelSerializer):
     responses = ConversationSerializer(many=True, read_only=True)
     
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import Document
+from .storage import ContentAddressedStorage
+
+@receiver(post_delete, sender=Document)
+def collect_orphaned_blob(sender, instance, **kwargs):
+    """Delete a document's blob once no other document references it"""
+    name = instance.file.name
+    storage = instance.file.storage
+    if not ContentAddressedStorage.is_blob(name):
+        return
+
+    def collect():
+        # The documents referencing a blob are its reference count; the lock
+        # keeps a concurrent upload of the same bytes from reusing it meanwhile
+        with storage.lock(name):
+            if not Document.objects.filter(file=name).exists():
+                storage.delete(name)
+
+    transaction.on_commit(collect)
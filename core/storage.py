@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{64}(?:\.[A-Za-z0-9]+)?$')
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps each distinct blob once, named by its SHA-256 digest.
+
+    An upload to ``documents/report.pdf`` is stored as
+    ``documents/<d[:2]>/<digest>.pdf``; uploading the same bytes again
+    returns the existing name instead of writing a copy.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from the content in _save, so there is never a
+        # collision to resolve with a random suffix.
+        return name
+
+    def blob_name(self, name, content) -> str:
+        """The content-addressed name an upload to ``name`` is stored under"""
+        digest = self.digest(content)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension).replace('\\', '/')
+
+    @contextmanager
+    def lock(self, name):
+        """Exclusive lock on a blob's directory, across threads and processes.
+
+        Held by an upload until its row is committed and by garbage
+        collection between its reference check and the delete, so a blob is
+        never removed just as a new upload starts referencing it.
+        """
+        path = os.path.join(os.path.dirname(self.path(name)), '.lock')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def _save(self, name, content):
+        name = self.blob_name(name, content)
+
+        if self.exists(name):
+            return name
+
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        # Write to a temporary file and rename so concurrent uploads of the
+        # same content never expose a partially written blob.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(full_path), suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in content.chunks():
+                    tmp_file.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name
+
+    @staticmethod
+    def digest(content) -> str:
+        """SHA-256 of a file's content"""
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def is_blob(name: str) -> bool:
+        """Whether a stored name was produced by this storage"""
+        return bool(name and BLOB_NAME_RE.search(name))
+
+
+content_addressed_storage = ContentAddressedStorage()
@@ -11,4 +11,5 @@ urlpatterns = [
     path('', include(router.urls)),
     # direct chat endpoint
     path('chat/', DocumentViewSet.as_view({'post': 'chat_without_document'}), name='chat-without-document'),
+    path('chat/cache-stats/', DocumentViewSet.as_view({'get': 'chat_cache_stats'}), name='chat-cache-stats'),
 ]
\ No newline at end of file
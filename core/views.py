@@ -1,22 +1,78 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+import json
 import logging
-from .models import Document, Analysis, Conversation
+import os
+import uuid
+from .models import Document, Analysis, Conversation, SectionAnalysis
+from .archive import merge_archived_conversations, thread_history
+from .downloads import serve_file
+from .exporters import EXPORT_FORMATS, stream_export
+from .idempotency import idempotent
+from .renderers import API_PARSER_CLASSES, API_RENDERER_CLASSES
 from .serializers import (
     DocumentSerializer, 
     AnalysisSerializer, 
     ConversationSerializer,
-    DocumentDetailSerializer
+    DocumentDetailSerializer,
+    with_raw_json
 )
-from .fee_analyzer.analyzer import FeeAnalyzer
+from .fee_analyzer import get_analyzer
+from .fee_analyzer.personas import DEFAULT_PERSONA, parse_persona_keys
+from .fee_analyzer.chat_cache import cached_chat_response, get_chat_cache
 
 logger = logging.getLogger(__name__)
 
+def export_response(request, kind):
+    """Stream an export filtered by the start, end and document query parameters"""
+    params = request.query_params
+    output = params.get('output', 'ndjson')
+    compress = params.get('compress', 'true').lower() not in ('0', 'false', 'no')
+
+    try:
+        stream = stream_export(
+            kind,
+            output=output,
+            compress=compress,
+            start=params.get('start'),
+            end=params.get('end'),
+            document=params.get('document')
+        )
+    except ValueError as e:
+        return Response(
+            {"error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    content_type, extension = EXPORT_FORMATS[output]
+    filename = f"{kind}.{extension}"
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+
+    logger.info(f"Streaming {kind} export as {filename}")
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 class AnalysisViewSet(viewsets.ModelViewSet):
     queryset = Analysis.objects.all()
     serializer_class = AnalysisSerializer
+    renderer_classes = API_RENDERER_CLASSES
+    parser_classes = API_PARSER_CLASSES
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Read-only actions render the stored JSON without decoding it
+            queryset = with_raw_json(queryset, 'fee_perspective_analysis', 'persona_analyses')
+        return queryset
 
     def list(self, request, *args, **kwargs):
         try:
@@ -28,9 +84,16 @@ class AnalysisViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream analyses as NDJSON or CSV"""
+        return export_response(request, 'analyses')
+
 class ConversationViewSet(viewsets.ModelViewSet):
     queryset = Conversation.objects.all()
     serializer_class = ConversationSerializer
+    renderer_classes = API_RENDERER_CLASSES
+    parser_classes = API_PARSER_CLASSES
 
     def list(self, request, *args, **kwargs):
         try:
@@ -42,9 +105,30 @@ class ConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream conversations as NDJSON or CSV"""
+        return export_response(request, 'conversations')
+
 class DocumentViewSet(viewsets.ModelViewSet):
     queryset = Document.objects.all()
     serializer_class = DocumentSerializer
+    renderer_classes = API_RENDERER_CLASSES
+    parser_classes = API_PARSER_CLASSES
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(Prefetch(
+                'analyses',
+                queryset=with_raw_json(Analysis.objects.all(), 'fee_perspective_analysis', 'persona_analyses')
+            ))
+        return queryset
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        """Upload a document"""
+        return super().create(request, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -72,12 +156,42 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download a document's file, honoring HTTP Range requests"""
+        try:
+            document = self.get_object()
+            if not document.file:
+                return Response(
+                    {"error": "No file associated with this document"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            extension = os.path.splitext(document.file.name)[1]
+            filename = document.title
+            if not filename.lower().endswith(extension):
+                filename += extension
+            return serve_file(request, document.file, filename=filename)
+
+        except ObjectDoesNotExist:
+            logger.error(f"Document {pk} not found")
+            return Response(
+                {"error": "Document not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        except Exception as e:
+            logger.error(f"Error downloading document {pk}: {str(e)}")
+            return Response(
+                {"error": "Failed to download document"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=True, methods=['post'])
+    @idempotent
     def analyze(self, request, pk=None):
         """Analyze a document from Fee's perspective"""
         try:
             document = self.get_object()
-            analyzer = FeeAnalyzer()
+            analyzer = get_analyzer()
             
             logger.info(f"Starting analysis for document {document.id}: {document.title}")
             
@@ -89,6 +203,24 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 )
             
             document.file.seek(0)
+
+            try:
+                personas = parse_persona_keys(request.data.get('personas'))
+            except ValueError as e:
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            mode = request.data.get('mode') or getattr(settings, 'FEE_ANALYSIS_MODE', 'text')
+            if mode not in analyzer.ANALYSIS_MODES:
+                return Response(
+                    {"error": f"Unknown analysis mode: {mode}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if personas:
+                return self._analyze_personas(document, analyzer, personas, mode)
             
             # Check for existing analysis
             existing_analysis = Analysis.objects.filter(document=document).first()
@@ -99,9 +231,13 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     "fee_perspective_analysis": existing_analysis.fee_perspective_analysis
                 })
             
+            incremental = str(request.data.get('incremental', '')).lower() in ('1', 'true', 'yes')
+            if document.parent_id or incremental:
+                return self._analyze_incremental(document, analyzer, mode)
+
             # Perform new analysis
             logger.info(f"Performing new analysis for document {document.id}")
-            analysis_result = analyzer.analyze_document(document.file)
+            analysis_result = analyzer.analyze_document(document.file, mode)
             
             analysis = Analysis.objects.create(
                 document=document,
@@ -126,7 +262,160 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _analyze_personas(self, document, analyzer, personas, mode):
+        """Run the requested personas concurrently, reusing stored results"""
+        existing_analysis = Analysis.objects.filter(document=document).first()
+
+        completed = {}
+        if existing_analysis:
+            completed = dict(existing_analysis.persona_analyses)
+            completed.setdefault(DEFAULT_PERSONA, existing_analysis.fee_perspective_analysis)
+
+        missing = [persona for persona in personas if persona not in completed]
+        # A new Analysis always carries Fee's result in fee_perspective_analysis
+        if not existing_analysis and DEFAULT_PERSONA not in missing:
+            missing.append(DEFAULT_PERSONA)
+
+        if not missing:
+            logger.info(f"Returning existing persona analyses for document {document.id}")
+            return Response({
+                "message": "Analysis already exists",
+                "fee_perspective_analysis": existing_analysis.fee_perspective_analysis,
+                "persona_analyses": {persona: completed[persona] for persona in personas}
+            })
+
+        logger.info(f"Performing persona analysis ({', '.join(missing)}) for document {document.id}")
+        results = analyzer.analyze_document_personas(document.file, missing, mode)
+
+        if existing_analysis:
+            existing_analysis.persona_analyses = {**existing_analysis.persona_analyses, **results}
+            existing_analysis.save(update_fields=['persona_analyses'])
+            analysis = existing_analysis
+        else:
+            analysis = Analysis.objects.create(
+                document=document,
+                fee_perspective_analysis=results[DEFAULT_PERSONA],
+                persona_analyses=results
+            )
+
+        completed.update(results)
+        logger.info(f"Persona analysis completed for document {document.id}")
+        return Response({
+            "fee_perspective_analysis": analysis.fee_perspective_analysis,
+            "persona_analyses": {persona: completed[persona] for persona in personas}
+        }, status=status.HTTP_201_CREATED)
+
+    def _analyze_incremental(self, document, analyzer, mode):
+        """Analyze a new version page by page, sending only pages without a cached result to the model.
+
+        Unchanged pages the parent never cached are analyzed together in one
+        call, and that result is cached under each of their hashes.
+        """
+        pages = analyzer.extract_pages_from_pdf(document.file)
+        page_hashes = [analyzer.hash_page(text) for text in pages]
+
+        parent_hashes = set()
+        if document.parent:
+            parent_hashes = set(self._get_page_hashes(document.parent, analyzer))
+        changed_pages = [
+            number for number, text_hash in enumerate(page_hashes, start=1)
+            if text_hash not in parent_hashes
+        ]
+
+        content = [
+            (number, text, text_hash)
+            for number, (text, text_hash) in enumerate(zip(pages, page_hashes), start=1)
+            if text.strip()
+        ]
+        if not content:
+            raise ValueError("No text could be extracted from the PDF")
+
+        cached = dict(
+            SectionAnalysis.objects.filter(
+                text_hash__in={text_hash for _, _, text_hash in content},
+                mode=mode,
+                prompt_version=analyzer.SECTION_PROMPT_VERSION
+            ).values_list('text_hash', 'analysis')
+        )
+        # Unchanged pages without a cached result (the parent was analyzed as a
+        # whole) are analyzed together in one call; the parent's own merged
+        # analysis is never reused, as it also covers the pages that changed
+        unchanged = [
+            (number, text, text_hash) for number, text, text_hash in content
+            if text_hash in parent_hashes and text_hash not in cached
+        ]
+        pending = {
+            text_hash: text for _, text, text_hash in content
+            if text_hash not in cached and text_hash not in parent_hashes
+        }
+        if unchanged:
+            pending['unchanged'] = "\n".join(text for _, text, _ in unchanged)
+
+        logger.info(
+            f"Incremental analysis for document {document.id}: "
+            f"{len(changed_pages)} changed pages, {len(pending)} sections sent to the model"
+        )
+        fresh = analyzer.analyze_sections(pending, mode)
+        carried_over = fresh.pop('unchanged', None)
+        fresh.update({text_hash: carried_over for _, _, text_hash in unchanged})
+
+        # Pages sharing one analysis (analyzed together, now or for an earlier
+        # version) form a single section so its findings are merged only once
+        groups = {}
+        for number, text, text_hash in content:
+            analysis = cached.get(text_hash, fresh.get(text_hash))
+            group = groups.setdefault(json.dumps(analysis, sort_keys=True), ([], [], analysis))
+            group[0].append(number)
+            group[1].append(text)
+        sections = [
+            (numbers[0] if len(numbers) == 1 else ", ".join(map(str, numbers)), "\n".join(texts), analysis)
+            for numbers, texts, analysis in groups.values()
+        ]
+        result = analyzer.merge_section_analyses(sections)
+        result["incremental"] = {
+            "parent": document.parent_id,
+            "changed_pages": changed_pages,
+            "reanalyzed_pages": [number for number, _, text_hash in content if text_hash in pending],
+            "carried_over_pages": [number for number, _, _ in unchanged]
+        }
+
+        with transaction.atomic():
+            SectionAnalysis.objects.bulk_create(
+                [
+                    SectionAnalysis(
+                        text_hash=text_hash, mode=mode,
+                        prompt_version=analyzer.SECTION_PROMPT_VERSION, analysis=analysis
+                    )
+                    for text_hash, analysis in fresh.items()
+                ],
+                ignore_conflicts=True
+            )
+            document.page_hashes = page_hashes
+            document.save(update_fields=['page_hashes'])
+            Analysis.objects.create(document=document, fee_perspective_analysis=result)
+
+        logger.info(f"Incremental analysis completed for document {document.id}")
+        return Response({
+            "fee_perspective_analysis": result
+        }, status=status.HTTP_201_CREATED)
+
+    def _get_page_hashes(self, document, analyzer):
+        """Return a document's page hashes, computing and storing them on first use"""
+        if document.page_hashes or not document.file:
+            return document.page_hashes
+
+        document.file.open('rb')
+        try:
+            pages = analyzer.extract_pages_from_pdf(document.file)
+        finally:
+            document.file.close()
+
+        document.page_hashes = [analyzer.hash_page(text) for text in pages]
+        document.save(update_fields=['page_hashes'])
+        return document.page_hashes
+
     @action(detail=False, methods=['post'])
+    @idempotent
     def chat_without_document(self, request):
         """Chat with Fee without document context"""
         try:
@@ -138,39 +427,40 @@ class DocumentViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Save user message
-            user_message = Conversation.objects.create(
-                document=None,
-                message=message.strip(),
-                is_fee=False
-            )
-
-            try:
-                # Get Fee's response for general chat
-                analyzer = FeeAnalyzer()
-                fee_response = analyzer.get_fee_chat_response(
+            # Get Fee's response for general chat before writing anything, so
+            # a failed model call leaves nothing to clean up
+            fee_response = cached_chat_response(
+                'chat_without_document',
+                analysis_id=None,
+                message=message,
+                history=None,
+                compute=lambda: get_analyzer().get_fee_chat_response(
                     user_message=message,
                     analysis_context=None,
                     conversation_history=None
-                )
+                ),
+                bypass='no-cache' in request.headers.get('Cache-Control', '')
+            )
 
-                # Save Fee's response
+            # Save both messages in one short write transaction
+            with transaction.atomic():
+                user_message = Conversation.objects.create(
+                    document=None,
+                    message=message.strip(),
+                    is_fee=False
+                )
                 fee_message = Conversation.objects.create(
                     document=None,
                     message=fee_response,
                     is_fee=True
                 )
 
-                return Response({
-                    'conversation': [
-                        ConversationSerializer(user_message).data,
-                        ConversationSerializer(fee_message).data
-                    ]
-                })
-
-            except Exception as e:
-                user_message.delete()  # Clean up user message if Fee's response fails
-                raise e
+            return Response({
+                'conversation': [
+                    ConversationSerializer(user_message).data,
+                    ConversationSerializer(fee_message).data
+                ]
+            })
 
         except Exception as e:
             logger.error(f"Error in chat without document: {str(e)}")
@@ -180,6 +470,7 @@ class DocumentViewSet(viewsets.ModelViewSet):
             )
 
     @action(detail=True, methods=['post'])
+    @idempotent
     def chat(self, request, pk=None):
         """Chat with Fee about a document"""
         try:
@@ -204,46 +495,56 @@ class DocumentViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-            # Save user message
-            user_message = Conversation.objects.create(
-                document=document,
-                message=message.strip(),
-                is_fee=False
-            )
+            # History comes from the asker's own thread; a message without a
+            # conversation_id opens a new thread, so it has no history yet
+            conversation_id = request.data.get('conversation_id')
+            if conversation_id and len(str(conversation_id)) > 50:
+                return Response(
+                    {"error": "conversation_id must be at most 50 characters"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            conversation_history = []
+            if conversation_id:
+                conversation_history = thread_history(document, conversation_id, 5)
+            else:
+                conversation_id = str(uuid.uuid4())
 
-            try:
-                # Get conversation history
-                conversation_history = []
-                if document:
-                    conversation_history = Conversation.objects.filter(
-                        document=document
-                    ).order_by('-timestamp')[:5]
-
-                # Get Fee's response
-                analyzer = FeeAnalyzer()
-                fee_response = analyzer.get_fee_chat_response(
+            # Get Fee's response before writing anything, so a failed model
+            # call leaves nothing to clean up
+            fee_response = cached_chat_response(
+                'chat',
+                analysis_id=analysis.id if analysis else None,
+                message=message,
+                history=conversation_history,
+                compute=lambda: get_analyzer().get_fee_chat_response(
                     user_message=message,
                     analysis_context=analysis.fee_perspective_analysis if analysis else None,
-                    conversation_history=list(conversation_history.values('message', 'is_fee'))
-                )
+                    conversation_history=conversation_history
+                ),
+                bypass='no-cache' in request.headers.get('Cache-Control', '')
+            )
 
-                # Save Fee's response
+            # Save both messages in one short write transaction
+            with transaction.atomic():
+                user_message = Conversation.objects.create(
+                    document=document,
+                    message=message.strip(),
+                    is_fee=False,
+                    conversation_id=conversation_id
+                )
                 fee_message = Conversation.objects.create(
                     document=document,
                     message=fee_response,
-                    is_fee=True
+                    is_fee=True,
+                    conversation_id=conversation_id
                 )
 
-                return Response({
-                    'conversation': [
-                        ConversationSerializer(user_message).data,
-                        ConversationSerializer(fee_message).data
-                    ]
-                })
-
-            except Exception as e:
-                user_message.delete()  # Clean up user message if Fee's response fails
-                raise e
+            return Response({
+                'conversation': [
+                    ConversationSerializer(user_message).data,
+                    ConversationSerializer(fee_message).data
+                ]
+            })
 
         except Exception as e:
             logger.error(f"Error in chat endpoint: {str(e)}")
@@ -252,6 +553,18 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    # Not an @action: routed only at chat/cache-stats/ in urls.py
+    def chat_cache_stats(self, request):
+        """Hit-rate metrics for the chat response cache"""
+        try:
+            return Response(get_chat_cache().stats())
+        except Exception as e:
+            logger.error(f"Error retrieving chat cache stats: {str(e)}")
+            return Response(
+                {"error": "Failed to retrieve chat cache stats"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @action(detail=True, methods=['get'])
     def conversations(self, request, pk=None):
         """Get all conversations for a document"""
@@ -259,9 +572,12 @@ class DocumentViewSet(viewsets.ModelViewSet):
             document = self.get_object()
             conversations = Conversation.objects.filter(document=document)
             serializer = ConversationSerializer(conversations, many=True)
+
+            # Older messages may have been moved out by archive_conversations
+            data = merge_archived_conversations(document, serializer.data)
             
-            logger.info(f"Returning {len(serializer.data)} conversations for document {document.id}")
-            return Response(serializer.data)
+            logger.info(f"Returning {len(data)} conversations for document {document.id}")
+            return Response(data)
             
         except ObjectDoesNotExist:
             logger.error(f"Document {pk} not found")
@@ -1,5 +1,5 @@
 import React, { useState, useRef } from 'react';
-import { sendChatMessage, uploadDocument } from '../../services/api';
+import { sendChatMessage, uploadDocument, idempotencyKeyFor } from '../../services/api';
 
 function MessageInput({ 
   documentId, 
@@ -13,6 +13,10 @@ function MessageInput({
   const [error, setError] = useState(null);
   const [isUploading, setIsUploading] = useState(false);
   const fileInputRef = useRef(null);
+  // Thread for this document's chat; the server starts one on the first message
+  const conversationRef = useRef({ documentId: null, id: null });
+  // Resending a message that failed reuses its key, so it is answered only once
+  const messageKeyRef = useRef(null);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -36,9 +40,20 @@ function MessageInput({
       setError(null);
       setIsTyping(true);
       
-      const response = await sendChatMessage(documentId, currentMessage);
+      if (conversationRef.current.documentId !== documentId) {
+        conversationRef.current = { documentId, id: null };
+      }
+      const conversationId = conversationRef.current.id;
+      const response = await sendChatMessage(
+        documentId,
+        currentMessage,
+        conversationId,
+        idempotencyKeyFor(messageKeyRef, [documentId, conversationId, currentMessage])
+      );
       
       if (response.conversation && Array.isArray(response.conversation)) {
+        messageKeyRef.current = null;
+        conversationRef.current.id = response.conversation[0]?.conversation_id || null;
         // Only send Fee's response since we've already shown the user message
         const feeResponse = response.conversation.find(msg => msg.is_fee);
         if (feeResponse) {
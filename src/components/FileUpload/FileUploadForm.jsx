@@ -1,5 +1,5 @@
 import React, { useState, useRef } from 'react';
-import { uploadDocument } from '../../services/api';
+import { uploadDocument, idempotencyKeyFor } from '../../services/api';
 
 function FileUploadForm({ onUploadSuccess, onClose }) {
   const [file, setFile] = useState(null);
@@ -9,6 +9,8 @@ function FileUploadForm({ onUploadSuccess, onClose }) {
   const [progress, setProgress] = useState(0);
   const [isDragging, setIsDragging] = useState(false);
   const fileInputRef = useRef(null);
+  // Submitting the same file and title again after a failure reuses the key
+  const uploadKeyRef = useRef(null);
 
   const handleDragOver = (e) => {
     e.preventDefault();
@@ -61,7 +63,8 @@ function FileUploadForm({ onUploadSuccess, onClose }) {
 
     try {
       setProgress(25);
-      const response = await uploadDocument(file, title.trim());
+      const response = await uploadDocument(file, title.trim(), idempotencyKeyFor(uploadKeyRef, [file, title.trim()]));
+      uploadKeyRef.current = null;
       setProgress(100);
       
       if (onUploadSuccess) {
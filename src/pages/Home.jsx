@@ -1,5 +1,5 @@
-import { useState, useEffect, useCallback } from 'react';
-import { analyzeDocument } from '../services/api';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { analyzeDocument, idempotencyKeyFor } from '../services/api';
 import FileUploadForm from '../components/FileUpload/FileUploadForm';
 import DocumentList from '../components/DocumentViewer/DocumentList';
 import AnalysisResults from '../components/Analysis/AnalysisResults';
@@ -16,6 +16,8 @@ function Home({ showDocuments, onToggleDocuments }) {
   const [showUpload, setShowUpload] = useState(false);
   const [pdfUrl, setPdfUrl] = useState(null);
   const [showChatHistory, setShowChatHistory] = useState(false);
+  // Retry Analysis resends with the same key, so the server runs it only once
+  const analysisKeyRef = useRef(null);
 
   // Reset states when document is deselected
   useEffect(() => {
@@ -38,17 +40,18 @@ function Home({ showDocuments, onToggleDocuments }) {
       setError(null);
       onToggleDocuments(false);
 
-      const fileUrl = constructFileUrl(document.file);
+      const fileUrl = constructFileUrl(document.download_url || document.file);
       setSelectedDocument({
         ...document,
         file: fileUrl
       });
       setPdfUrl(fileUrl);
 
-      const result = await analyzeDocument(document.id);
+      const result = await analyzeDocument(document.id, idempotencyKeyFor(analysisKeyRef, [document.id]));
       if (!result.fee_perspective_analysis) {
         throw new Error('Invalid analysis data received');
       }
+      analysisKeyRef.current = null;
 
       setAnalysis(result.fee_perspective_analysis);
       setActiveView('chat'); // Switch to chat view when document is selected
@@ -63,7 +66,7 @@ function Home({ showDocuments, onToggleDocuments }) {
 
   const handleUploadSuccess = async (document) => {
     try {
-      const fileUrl = constructFileUrl(document.file);
+      const fileUrl = constructFileUrl(document.download_url || document.file);
       setSelectedDocument({
         ...document,
         file: fileUrl
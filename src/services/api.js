@@ -9,7 +9,27 @@ const api = axios.create({
   },
 });
 
-export const uploadDocument = async (file, title) => {
+// The server replays its stored response for a repeated key, so every retry
+// of one user action must send the same key; without one, a new key is made
+const idempotencyHeaders = (key) => ({
+  'Idempotency-Key': key || crypto.randomUUID(),
+});
+
+// Key for a user action, kept in a ref: repeating the same action (same
+// values, compared with ===) reuses the key until the caller clears the ref
+// with `ref.current = null` after a success
+export const idempotencyKeyFor = (ref, action) => {
+  const previous = ref.current;
+  const same = previous
+    && previous.action.length === action.length
+    && previous.action.every((value, index) => value === action[index]);
+  if (!same) {
+    ref.current = { action, key: crypto.randomUUID() };
+  }
+  return ref.current.key;
+};
+
+export const uploadDocument = async (file, title, idempotencyKey = null) => {
   try {
     const formData = new FormData();
     formData.append('file', file);
@@ -17,6 +37,7 @@ export const uploadDocument = async (file, title) => {
     const response = await api.post('/documents/', formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
+        ...idempotencyHeaders(idempotencyKey),
       },
     });
     return response.data;
@@ -26,9 +47,11 @@ export const uploadDocument = async (file, title) => {
   }
 };
 
-export const analyzeDocument = async (documentId) => {
+export const analyzeDocument = async (documentId, idempotencyKey = null) => {
   try {
-    const response = await api.post(`/documents/${documentId}/analyze/`);
+    const response = await api.post(`/documents/${documentId}/analyze/`, null, {
+      headers: idempotencyHeaders(idempotencyKey),
+    });
     
     if (!response.data || !response.data.fee_perspective_analysis) {
       throw new Error('Invalid analysis data received from server');
@@ -65,17 +88,18 @@ export const getAnalysis = async (analysisId) => {
   }
 };
 
-export const sendChatMessage = async (documentId, message) => {
+export const sendChatMessage = async (documentId, message, conversationId = null, idempotencyKey = null) => {
   try {
     let response;
     
     if (documentId) {
       // Chat with document context
       response = await api.post(`/documents/${documentId}/chat/`, 
-        { message: message },
+        { message: message, conversation_id: conversationId },
         {
           headers: {
             'Content-Type': 'application/json',
+            ...idempotencyHeaders(idempotencyKey),
           }
         }
       );
@@ -86,6 +110,7 @@ export const sendChatMessage = async (documentId, message) => {
         {
           headers: {
             'Content-Type': 'application/json',
+            ...idempotencyHeaders(idempotencyKey),
           }
         }
       );